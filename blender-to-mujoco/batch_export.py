@@ -0,0 +1,111 @@
+"""Export many .blend files to MuJoCo in parallel, without the Blender UI.
+
+Each job runs in its own headless Blender process:
+
+    python batch_export.py jobs.json --blender /path/to/blender --processes 4
+
+jobs.json is a list of {"input": "robot.blend", "output": "out/robot",
+"options": {"mesh_format": "STL"}}. Options are scene.my_tool settings.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# imports the add-on package from this folder, whether it is installed or not
+EXPORT_EXPR = (
+    "import sys; sys.path.insert(0, {!r}); "
+    "import blender_to_mujoco; blender_to_mujoco.main()"
+).format(str(Path(__file__).resolve().parent))
+RESULT_NAME = "export_result.json"
+
+
+def load_jobs(path):
+    with open(path) as f:
+        jobs = json.load(f)
+    base = Path(path).parent
+    for job in jobs:
+        job["input"] = str(base / job["input"])
+        job["output"] = str(base / job["output"])
+        job.setdefault("options", {})
+    return jobs
+
+
+def run_job(blender, job, mesh_workers):
+    """Export one .blend file in a background Blender and return its summary."""
+    options = dict(job["options"])
+    options.setdefault("mesh_workers", mesh_workers)
+    os.makedirs(job["output"], exist_ok=True)
+    result_path = os.path.join(job["output"], RESULT_NAME)
+
+    command = [
+        blender,
+        "-b",
+        job["input"],
+        "--factory-startup",
+        "--python-exit-code",
+        "1",
+        "--python-expr",
+        EXPORT_EXPR,
+        "--",
+        "--output",
+        job["output"],
+        "--options",
+        json.dumps(options),
+        "--result",
+        result_path,
+    ]
+
+    start = time.perf_counter()
+    process = subprocess.run(command, capture_output=True, text=True)
+    summary = {
+        "input": job["input"],
+        "output": job["output"],
+        "returncode": process.returncode,
+        "seconds": time.perf_counter() - start,
+    }
+    if process.returncode == 0 and os.path.exists(result_path):
+        with open(result_path) as f:
+            summary["result"] = json.load(f)
+    else:
+        summary["log"] = (process.stdout + process.stderr)[-4000:]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("jobs", help="JSON list of export jobs")
+    parser.add_argument("--blender", default="blender", help="Blender executable")
+    parser.add_argument(
+        "--processes", type=int, default=1, help="Blender processes to run at once"
+    )
+    parser.add_argument("--summary", help="write the combined summary here")
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    processes = max(1, args.processes)
+    mesh_workers = max(1, (os.cpu_count() or 1) // processes)
+
+    with ThreadPoolExecutor(max_workers=processes) as pool:
+        results = list(
+            pool.map(lambda job: run_job(args.blender, job, mesh_workers), jobs)
+        )
+
+    failed = [r for r in results if r["returncode"] != 0 or r.get("result") is None]
+    for r in results:
+        status = "failed" if r in failed else "ok"
+        print("{}: {} ({:.1f}s)".format(status, r["input"], r["seconds"]))
+
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(results, f, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
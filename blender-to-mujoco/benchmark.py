@@ -0,0 +1,188 @@
+"""Benchmark the exporter on synthetic scenes.
+
+Runs inside Blender:
+
+    blender -b --factory-startup --python benchmark.py -- --links 10 100 1000
+
+Every combination of the size arguments is generated into an empty scene,
+exported and timed per phase by the exporter's profiler. Results are
+written as JSON.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+# mesh worker processes run this file again as __mp_main__, without Blender
+if __name__ == "__main__":
+    import bmesh
+    import bpy
+
+    # blender --python does not put the script's folder on sys.path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import blender_to_mujoco as b2m
+
+DEFAULT_OPTIONS = {"export_files": True, "use_mesh_cache": False}
+
+
+def clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+    for material in list(bpy.data.materials):
+        bpy.data.materials.remove(material)
+
+
+def sphere_mesh(name, vertices):
+    """A closed UV sphere with roughly the requested number of vertices."""
+    rings = max(3, int((vertices / 2) ** 0.5))
+    segments = max(3, (vertices - 2) // (rings - 1))
+    bm = bmesh.new()
+    bmesh.ops.create_uvsphere(bm, u_segments=segments, v_segments=rings, radius=0.1)
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+
+def generate_scene(links, meshes, vertices, collisions, materials, topology, branching):
+    """Fill the scene with a LINK hierarchy and its geoms.
+
+    Every link gets a hinge joint. Mesh geoms and box collisions are spread
+    over the links in turn, and each mesh has its own datablock.
+    """
+    clear_scene()
+    collection = bpy.context.scene.collection
+
+    palette = []
+    for i in range(materials):
+        material = bpy.data.materials.new("material_{}".format(i))
+        material.diffuse_color = (i / max(materials, 1), 0.5, 0.5, 1.0)
+        palette.append(material)
+
+    link_objs = []
+    for i in range(links):
+        obj = bpy.data.objects.new("link_{}".format(i), None)
+        collection.objects.link(obj)
+        obj.properties.mujoco_type = "LINK"
+        if i:
+            if topology == "chain":
+                obj.parent = link_objs[i - 1]
+            else:
+                obj.parent = link_objs[(i - 1) // branching]
+            obj.location = (0.2, 0.05 * (i % 3), 0.0)
+            obj.rotation_euler = (0.0, 0.0, 0.1 * (i % 7))
+            obj.properties.mujoco_joint = True
+            obj.properties.joint_type = "HINGE"
+            obj.properties.joint_range_min = -90
+            obj.properties.joint_range_max = 90
+        link_objs.append(obj)
+
+    for i in range(meshes):
+        mesh = sphere_mesh("geom_{}".format(i), vertices)
+        if palette:
+            mesh.materials.append(palette[i % len(palette)])
+        obj = bpy.data.objects.new("geom_{}".format(i), mesh)
+        collection.objects.link(obj)
+        obj.parent = link_objs[i % links]
+        obj.location = (0.1, 0.0, 0.0)
+        obj.properties.mujoco_type = "GEOM"
+        obj.properties.primitive = "mesh"
+
+    for i in range(collisions):
+        obj = bpy.data.objects.new("collision_{}".format(i), sphere_mesh("box", 8))
+        collection.objects.link(obj)
+        obj.parent = link_objs[i % links]
+        obj.scale = (0.1, 0.05, 0.02)
+        obj.properties.mujoco_type = "COLLISION"
+        obj.properties.primitive = "box"
+        obj.properties.is_collision = True
+
+    bpy.context.view_layer.update()
+
+
+def run_export(output):
+    """Export the scene and return the export summary with its report."""
+    start = time.perf_counter()
+    summary = b2m.export_scene(output)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("--links", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--meshes", type=int, nargs="+", default=[10])
+    parser.add_argument("--vertices", type=int, nargs="+", default=[500])
+    parser.add_argument("--collisions", type=int, nargs="+", default=[0])
+    parser.add_argument("--materials", type=int, default=4)
+    parser.add_argument(
+        "--topology", nargs="+", choices=["chain", "tree"], default=["chain"]
+    )
+    parser.add_argument("--branching", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--options", default="{}", help="JSON object of export settings (my_tool)"
+    )
+    parser.add_argument("--result", default="benchmark_result.json")
+    args = parser.parse_args(argv)
+
+    b2m.register()
+    mytool = bpy.context.scene.my_tool
+    options = dict(DEFAULT_OPTIONS, **json.loads(args.options))
+    for key, value in options.items():
+        setattr(mytool, key, value)
+
+    results = []
+    for links, meshes, vertices, collisions, topology in itertools.product(
+        args.links, args.meshes, args.vertices, args.collisions, args.topology
+    ):
+        scene_args = {
+            "links": links,
+            "meshes": meshes,
+            "vertices": vertices,
+            "collisions": collisions,
+            "materials": args.materials,
+            "topology": topology,
+            "branching": args.branching,
+        }
+        start = time.perf_counter()
+        generate_scene(**scene_args)
+        generate_seconds = time.perf_counter() - start
+
+        runs = []
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as output:
+                runs.append(run_export(os.path.join(output, "")))
+
+        best = min(runs, key=lambda run: run["seconds"])
+        result = {
+            "scene": scene_args,
+            "options": options,
+            "generate_seconds": generate_seconds,
+            "seconds": [run["seconds"] for run in runs],
+            "best": {
+                "seconds": best["seconds"],
+                "phases": best["report"]["phases"],
+                "counters": best["report"]["counters"],
+            },
+            "meshes_written": best["meshes_written"],
+            "errors": best["errors"],
+        }
+        results.append(result)
+        print(
+            "{links} links, {meshes} meshes x {vertices} vertices, {topology}: "
+            "{seconds:.3f}s".format(seconds=best["seconds"], **scene_args)
+        )
+
+    with open(args.result, "w") as f:
+        json.dump({"blender": bpy.app.version_string, "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else [])
@@ -0,0 +1,22 @@
+bl_info = {
+    "name": "Mujoco Exporter",
+    "description": "Exports Blender files to Mujoco format",
+    "author": "@byrondavid",
+    "version": (1, 0, 0),
+    "blender": (3, 5, 0),
+    "location": "3D View > Tools",
+    "warning": "",  # used for warning icon and text in addons panel
+    "wiki_url": "",
+    "tracker_url": "",
+    "category": "Development",
+}
+
+# mjcf_model and mesh_io do not need Blender (mesh worker processes import
+# the package without it); the add-on itself does
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+if bpy is not None:
+    from .exporter import export_scene, main, register, unregister
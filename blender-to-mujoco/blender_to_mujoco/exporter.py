@@ -0,0 +1,2449 @@
+"""Blender side of the exporter: panel, properties and the scene walk."""
+
+import bpy
+import bmesh
+from bpy.props import (
+    StringProperty,
+    BoolProperty,
+    IntProperty,
+    EnumProperty,
+    FloatProperty,
+    PointerProperty,
+)
+from bpy.types import (
+    Operator,
+    PropertyGroup,
+)
+from bpy.app.handlers import persistent
+from bpy.props import *
+from lxml import etree as ET
+from pathlib import Path
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import argparse
+import sys
+import time
+import threading
+import cProfile
+import pstats
+from contextlib import ExitStack, contextmanager
+import multiprocessing
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+
+from .image_io import downscale, linear_to_srgb, write_png
+from .mesh_io import MESH_FORMATS, MeshData, face_normals, write_mesh_file
+from .mjcf_model import (
+    Actuator,
+    Body,
+    Camera,
+    DEFAULT_LIGHTS,
+    Geom,
+    Joint,
+    Light,
+    Material,
+    MeshAsset,
+    Model,
+    Site,
+    Texture,
+    emit_actuator,
+    emit_body,
+    emit_header,
+    emit_lights,
+    emit_worldbody,
+    body_items,
+    format_body,
+    format_model,
+)
+from .poses import euler_xyz, local_poses
+from .primitive_fit import best_primitive
+
+scene = bpy.context.scene
+collision_name = ""
+
+MANIFEST_NAME = "mesh_manifest.json"
+TEXTURE_MANIFEST_NAME = "texture_manifest.json"
+MANIFEST_VERSION = 1
+REPORT_NAME = "export_report.json"
+PROFILE_NAME = "export_profile.prof"
+BACKUP_NAME = ".mujoco_export_backup"
+MODAL_SLICE = 0.05
+# settings the XML and mesh files depend on; changing one forces a full export
+PATCH_SETTINGS = (
+    "export_files",
+    "mesh_format",
+    "fit_primitives",
+    "fit_tolerance",
+    "collision_hulls",
+    "hull_max_vertices",
+    "hull_max_pieces",
+    "export_textures",
+    "precision",
+)
+
+
+def read_mesh_data(obj, depsgraph, name):
+    """Read vertex, loop and triangle data from the evaluated object.
+
+    Vertices stay in object space; the object scale is written on the
+    mesh asset so objects sharing a datablock can share the file.
+    """
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+
+    try:
+        mesh.calc_loop_triangles()
+        if not hasattr(mesh, "corner_normals"):
+            mesh.calc_normals_split()
+
+        vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vertices)
+
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        loops = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", loops)
+
+        normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        if hasattr(mesh, "corner_normals"):
+            mesh.corner_normals.foreach_get("vector", normals)
+        else:
+            mesh.loops.foreach_get("normal", normals)
+
+        uvs = None
+        if mesh.uv_layers.active:
+            uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+            mesh.uv_layers.active.data.foreach_get("uv", uvs)
+            uvs = uvs.reshape(-1, 2)
+    finally:
+        eval_obj.to_mesh_clear()
+
+    return MeshData(
+        name,
+        vertices.reshape(-1, 3),
+        triangles.reshape(-1, 3),
+        loops.reshape(-1, 3),
+        normals.reshape(-1, 3),
+        uvs,
+    )
+
+
+def mesh_file_name(name):
+    """File name of a mesh asset in the selected export format."""
+    return name + MESH_FORMATS[scene.my_tool.mesh_format][0]
+
+
+def mesh_file_stem(obj):
+    """Name of the mesh file an object is written to.
+
+    Objects are keyed by their mesh datablock, so every object sharing
+    obj.data shares one file. Modifiers change the evaluated geometry,
+    so a modified object with a shared datablock gets its own file.
+    Objects that are not meshes, such as empties, use their own name.
+    """
+    if obj.type != "MESH":
+        return obj.name
+    if obj.modifiers and obj.data.users > 1:
+        return "{}_{}".format(obj.data.name, obj.name)
+    return obj.data.name
+
+
+def mesh_asset(obj, stem=None):
+    """Return the asset name, file name and scale of a mesh object."""
+    if stem is None:
+        stem = mesh_file_stem(obj)
+    scale = [round(v, 4) for v in obj.scale]
+    if scale == [1, 1, 1]:
+        return stem, mesh_file_name(stem), None
+
+    asset_name = "{}_{}".format(stem, "_".join(str(v) for v in scale))
+    return asset_name, mesh_file_name(stem), tuple(scale)
+
+
+def is_collision_mesh(obj):
+    record = index.record(obj)
+    return (
+        record.mujoco_type == "COLLISION" or record.is_collision
+    ) and record.primitive == "mesh"
+
+
+def convex_hull(points):
+    """Return the vertices and triangles of the convex hull of points."""
+    bm = bmesh.new()
+    for point in points:
+        bm.verts.new(point)
+
+    result = bmesh.ops.convex_hull(bm, input=bm.verts, use_existing_faces=False)
+    bmesh.ops.delete(
+        bm, geom=result["geom_interior"] + result["geom_unused"], context="VERTS"
+    )
+    bmesh.ops.triangulate(bm, faces=bm.faces)
+    bm.verts.index_update()
+
+    vertices = np.array([v.co[:] for v in bm.verts], dtype=np.float32)
+    triangles = np.array([[v.index for v in f.verts] for f in bm.faces], dtype=np.int32)
+    bm.free()
+    return vertices, triangles.reshape(-1, 3)
+
+
+def hull_volume(vertices, triangles):
+    """Volume of a convex hull, independent of triangle winding."""
+    if len(triangles) == 0:
+        return 0.0
+    corners = vertices[triangles].astype(np.float64) - vertices.mean(axis=0)
+    volumes = np.einsum(
+        "ij,ij->i", corners[:, 0], np.cross(corners[:, 1], corners[:, 2])
+    )
+    return np.abs(volumes).sum() / 6
+
+
+def is_solid(points, tolerance=1e-6):
+    """Whether points enclose a volume: at least 4 of them, not coplanar."""
+    if len(points) < 4:
+        return False
+    offsets = points.astype(np.float64) - points.mean(axis=0)
+    singular = np.linalg.svd(offsets, compute_uv=False)
+    return singular[2] > tolerance * singular[0]
+
+
+def farthest_points(points, count):
+    """Pick count points spread over the set by farthest point sampling."""
+    chosen = [np.argmax(np.linalg.norm(points - points.mean(axis=0), axis=1))]
+    distance = np.linalg.norm(points - points[chosen[0]], axis=1)
+    for _ in range(count - 1):
+        chosen.append(np.argmax(distance))
+        distance = np.minimum(
+            distance, np.linalg.norm(points - points[chosen[-1]], axis=1)
+        )
+    return points[chosen]
+
+
+def capped_hull(points, max_vertices):
+    """Convex hull with at most max_vertices vertices."""
+    vertices, triangles = convex_hull(points)
+    if len(vertices) > max_vertices:
+        vertices, triangles = convex_hull(farthest_points(vertices, max_vertices))
+    return vertices, triangles
+
+
+def bisect_triangles(vertices, triangles):
+    """Split triangles in two along the principal axis of their centroids."""
+    centroids = vertices[triangles].mean(axis=1)
+    offsets = centroids - centroids.mean(axis=0)
+    axis = np.linalg.eigh(offsets.T @ offsets)[1][:, -1]
+    side = offsets @ axis > 0
+    if side.all() or not side.any():
+        return None
+    return triangles[side], triangles[~side]
+
+
+def convex_decomposition(data, max_pieces, max_vertices, min_gain=0.1):
+    """Approximate convex decomposition by recursive bisection.
+
+    A piece is split while splitting it shrinks the summed hull volume
+    by at least min_gain, so convex parts stay whole and concave parts
+    are cut until max_pieces is reached. Pieces keep whole triangles,
+    so neighbouring hulls overlap along the cut instead of leaving gaps.
+    Flat pieces have no volume, which MuJoCo rejects, and are dropped.
+    """
+    pending = [data.triangles]
+    done = []
+    while pending:
+        triangles = pending.pop()
+        points = data.vertices[np.unique(triangles)]
+
+        if len(done) + len(pending) + 2 <= max_pieces and len(triangles) > 1:
+            halves = bisect_triangles(data.vertices, triangles)
+            if halves is not None:
+                whole = hull_volume(*convex_hull(points))
+                split = sum(
+                    hull_volume(*convex_hull(data.vertices[np.unique(half)]))
+                    for half in halves
+                )
+                if split < whole * (1 - min_gain):
+                    pending.extend(halves)
+                    continue
+
+        done.append(points)
+
+    hulls = [capped_hull(points, max_vertices) for points in done if is_solid(points)]
+    return [
+        (vertices, triangles) for vertices, triangles in hulls if is_solid(vertices)
+    ]
+
+
+def hull_mesh_data(name, vertices, triangles):
+    """Wrap hull geometry as flat shaded mesh data."""
+    normals = np.repeat(face_normals(vertices, triangles), 3, axis=0)
+    loops = np.arange(triangles.size, dtype=np.int32).reshape(-1, 3)
+    return MeshData(name, vertices, triangles, loops, normals, None)
+
+
+def mesh_digest(data, settings):
+    """Hash evaluated geometry together with the export settings."""
+    digest = hashlib.sha1(json.dumps(settings, sort_keys=True).encode())
+    for array in (data.vertices, data.triangles, data.loops, data.normals, data.uvs):
+        if array is not None:
+            digest.update(str(array.shape).encode())
+            digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+class OutputRollback:
+    """Files an export overwrote or deleted, restored if it is cancelled.
+
+    While active, every file about to be written or deleted is first
+    copied into a backup folder of the output directory, once per export.
+    The file itself stays in place, so a write that fails can be undone
+    on its own with restore.
+    """
+
+    directory = None
+    backups = {}
+    written = set()
+    lock = threading.Lock()
+
+    def begin(self, directory):
+        self.directory = Path(directory) / BACKUP_NAME
+        self.backups = {}
+        self.written = set()
+        # left over from an export that did not finish
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def protect(self, path):
+        """Back up the current version of path before it is replaced."""
+        if self.directory is None:
+            return
+        path = Path(path)
+        with self.lock:
+            if path in self.written:
+                return
+            self.written.add(path)
+            if path.is_file():
+                self.directory.mkdir(exist_ok=True)
+                backup = self.directory / str(len(self.backups))
+                shutil.copy2(path, backup)
+                self.backups[path] = backup
+
+    def restore(self, path):
+        """Put back the previous version of path after a failed write."""
+        if self.directory is None:
+            return
+        path = Path(path)
+        with self.lock:
+            backup = self.backups.get(path)
+            if backup is not None:
+                shutil.copy2(backup, path)
+            elif path in self.written and path.is_file():
+                path.unlink()
+
+    def remove(self, path):
+        """Delete path, keeping a backup while active."""
+        self.protect(path)
+        Path(path).unlink()
+
+    def commit(self):
+        """Keep the export and drop the backups."""
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+    def undo(self):
+        """Delete the files written and restore the backups."""
+        if self.directory is None:
+            return
+        for path in self.written:
+            if path.is_file():
+                path.unlink()
+        for path, backup in self.backups.items():
+            os.replace(backup, path)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+
+rollback = OutputRollback()
+
+
+class MeshCache:
+    """On-disk manifest of exported mesh files.
+
+    Entries map a mesh name to the hash of its geometry and the file it
+    was written to. Files are content addressed, so a renamed object
+    with unchanged geometry is copied instead of encoded again.
+    """
+
+    def __init__(self, directory, name=MANIFEST_NAME):
+        self.directory = Path(directory)
+        self.path = self.directory / name
+        self.entries = {}
+        self.replaced = []
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if manifest.get("version") == MANIFEST_VERSION:
+            self.entries = manifest.get("meshes", {})
+
+    def save(self):
+        manifest = {"version": MANIFEST_VERSION, "meshes": self.entries}
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        rollback.protect(self.path)
+        os.replace(temp_path, self.path)
+
+    def files(self, entry):
+        return entry.get("files", [entry["file"]])
+
+    def current_files(self, name, digest):
+        """Return the files of an entry if its hash matches and they exist."""
+        entry = self.entries.get(name)
+        if entry is None or entry["hash"] != digest:
+            return None
+        files = self.files(entry)
+        if all((self.directory / f).is_file() for f in files):
+            return files
+        return None
+
+    def is_current(self, name, digest, file_name):
+        entry = self.entries.get(name)
+        return (
+            entry is not None
+            and entry["hash"] == digest
+            and entry["file"] == file_name
+            and (self.directory / file_name).is_file()
+        )
+
+    def find(self, digest):
+        """Return an existing file written with the same hash."""
+        for entry in self.entries.values():
+            if entry["hash"] == digest and (self.directory / entry["file"]).is_file():
+                return self.directory / entry["file"]
+        return None
+
+    def store(self, name, digest, file_name, files=None):
+        entry = {"hash": digest, "file": file_name}
+        if files is not None:
+            entry["files"] = files
+
+        old_entry = self.entries.get(name)
+        if old_entry is not None and self.files(old_entry) != self.files(entry):
+            self.replaced.append(old_entry)
+        self.entries[name] = entry
+
+    def prune(self, names):
+        """Drop entries of deleted or renamed meshes and their files."""
+        stale = self.replaced + [
+            self.entries.pop(name) for name in list(self.entries) if name not in names
+        ]
+        in_use = set()
+        for entry in self.entries.values():
+            in_use.update(self.files(entry))
+
+        for entry in stale:
+            for stale_file in self.files(entry):
+                stale_path = self.directory / stale_file
+                if stale_file not in in_use and stale_path.is_file():
+                    rollback.remove(stale_path)
+
+
+class MeshJob:
+    """Mesh buffers and target file handed to a worker"""
+
+    def __init__(self, name, path, data, digest, mesh_format):
+        self.name = name
+        self.path = path
+        self.data = data
+        self.digest = digest
+        self.mesh_format = mesh_format
+
+
+def write_mesh(job):
+    """Encode and write one mesh file on the calling thread."""
+    rollback.protect(job.path)
+    write_mesh_file(job.mesh_format, job.path, job.data)
+    return job
+
+
+class MeshPool:
+    """Worker processes that encode mesh files, kept between exports.
+
+    Processes are spawned rather than forked, so they do not copy the
+    Blender process; they only import mesh_io. If they cannot run, the
+    pool falls back to threads for the rest of the session.
+    """
+
+    executor = None
+    workers = 0
+    use_processes = True
+
+    def get(self):
+        workers = scene.my_tool.mesh_workers or os.cpu_count()
+        if self.executor is None or self.workers != workers:
+            self.shutdown()
+            if self.use_processes:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=workers)
+            self.workers = workers
+        return self.executor
+
+    def submit(self, job):
+        """Start writing job in a worker, protecting its file first."""
+        rollback.protect(job.path)
+        return self.get().submit(write_mesh_file, job.mesh_format, job.path, job.data)
+
+    def result(self, future, job):
+        """Wait for a job; if the pool broke, write the job here instead."""
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            print("Mesh worker processes failed, writing meshes in threads")
+            self.use_processes = False
+            self.shutdown()
+            return write_mesh(job)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+
+
+mesh_pool = MeshPool()
+
+
+class CollisionHulls:
+    """Convex pieces written in place of collision meshes.
+
+    Pieces are generated while the XML is built, and their files are
+    written with the other meshes by the mesh pool.
+    """
+
+    pieces = {}
+    jobs = []
+    digests = {}
+
+    def clear(self):
+        self.pieces = {}
+        self.jobs = []
+        self.digests = {}
+
+    def take_jobs(self):
+        """Return the write jobs of the pieces generated since the last call."""
+        jobs, self.jobs = self.jobs, []
+        return jobs
+
+    def store(self, cache, errors):
+        """Record the hulls whose pieces were all written in the cache."""
+        for stem, digest in self.digests.items():
+            pieces = self.pieces.get(stem, [])
+            if pieces and not any(piece in errors for piece in pieces):
+                files = [mesh_file_name(piece) for piece in pieces]
+                cache.store(stem + "_hull", digest, files[0], files)
+        self.digests = {}
+
+    def enabled(self, obj):
+        return (
+            scene.my_tool.export_files
+            and scene.my_tool.collision_hulls != "NONE"
+            and obj.type == "MESH"
+            and is_collision_mesh(obj)
+            and primitives.fit(obj) is None
+        )
+
+    def assets(self, obj):
+        """Return the asset name, file name and scale of each hull piece.
+
+        An empty list means the full mesh is used for collision.
+        """
+        stem = mesh_file_stem(obj)
+        if stem not in self.pieces:
+            try:
+                self.pieces[stem] = self.build(obj, stem)
+            except Exception as error:
+                exporter.errors[stem + "_hull"] = str(error)
+                self.pieces[stem] = []
+        return [mesh_asset(obj, piece) for piece in self.pieces[stem]]
+
+    def names(self):
+        return {stem + "_hull" for stem, pieces in self.pieces.items() if pieces}
+
+    def build(self, obj, stem):
+        """Generate hull pieces and queue their files, reusing cached ones."""
+        mytool = scene.my_tool
+        cache = exporter.cache
+        data = read_mesh_data(obj, exporter.depsgraph, stem)
+        digest = mesh_digest(
+            data,
+            {
+                "format": mytool.mesh_format,
+                "hulls": mytool.collision_hulls,
+                "max_vertices": mytool.hull_max_vertices,
+                "max_pieces": mytool.hull_max_pieces,
+            },
+        )
+
+        if cache is not None:
+            files = cache.current_files(stem + "_hull", digest)
+            if files is not None:
+                exporter.hits += 1
+                return [Path(f).stem for f in files]
+
+        max_pieces = 1 if mytool.collision_hulls == "HULL" else mytool.hull_max_pieces
+        hull_pieces = convex_decomposition(data, max_pieces, mytool.hull_max_vertices)
+
+        piece_names = []
+        for index, (vertices, triangles) in enumerate(hull_pieces):
+            piece = "{}_hull{}".format(stem, index)
+            piece_data = hull_mesh_data(piece, vertices, triangles)
+            self.jobs.append(
+                MeshJob(
+                    piece,
+                    Path(file.path) / mesh_file_name(piece),
+                    piece_data,
+                    None,
+                    mytool.mesh_format,
+                )
+            )
+            piece_names.append(piece)
+
+        if cache is not None and piece_names:
+            self.digests[stem] = digest
+        return piece_names
+
+
+class PrimitiveFits:
+    """Primitive geoms fitted in place of collision meshes"""
+
+    fits = {}
+
+    def clear(self):
+        self.fits = {}
+
+    def fit(self, obj):
+        """Return the fitted primitive of a collision mesh, or None."""
+        if not (
+            scene.my_tool.fit_primitives
+            and obj.type == "MESH"
+            and is_collision_mesh(obj)
+        ):
+            return None
+
+        if obj.name not in self.fits:
+            try:
+                data = read_mesh_data(obj, exporter.depsgraph, obj.name)
+                points = data.vertices.astype(np.float64) * np.array(obj.scale)
+                self.fits[obj.name] = best_primitive(
+                    points,
+                    hull_volume(*convex_hull(points)),
+                    scene.my_tool.fit_tolerance,
+                )
+            except Exception as error:
+                exporter.errors[obj.name + "_fit"] = str(error)
+                self.fits[obj.name] = None
+        return self.fits[obj.name]
+
+    def fit_geom(self, geom, obj):
+        """Set type, size, pos and euler of geom to the fitted primitive.
+
+        The fit offset and rotation are composed with the object pose.
+        """
+        fit = self.fit(obj)
+        record = index.record(obj)
+        pos = np.array(record.pos) + record.rotation @ fit.center
+        euler = euler_xyz((record.rotation @ fit.rotation)[np.newaxis])[0]
+        geom.type = fit.primitive
+        geom.mesh = None
+        geom.size = tuple(fit.size)
+        geom.pos = tuple(pos.tolist())
+        geom.euler = tuple(euler.tolist())
+
+
+class ExportProfile:
+    """Phase timers and counters of the last export"""
+
+    phases = {}
+    counters = {}
+    profile = None
+    started = 0.0
+    idle = 0.0
+    paused = None
+
+    def begin(self, capture=False):
+        self.phases = {}
+        self.counters = {}
+        self.profile = cProfile.Profile() if capture else None
+        self.started = time.perf_counter()
+        self.idle = 0.0
+        self.paused = None
+        if self.profile is not None:
+            self.profile.enable()
+
+    def pause(self):
+        """Stop the clock while a modal export hands control back to Blender."""
+        self.paused = time.perf_counter()
+        if self.profile is not None:
+            self.profile.disable()
+
+    def resume(self):
+        if self.paused is not None:
+            self.idle += time.perf_counter() - self.paused
+            self.paused = None
+        if self.profile is not None:
+            self.profile.enable()
+
+    @contextmanager
+    def phase(self, name):
+        """Add the wall-clock time of the block to the phase."""
+        start = time.perf_counter()
+        idle = self.idle
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - start - (self.idle - idle)
+            )
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self, directory):
+        """Stop timing and write the report, and profile, to directory."""
+        report = {
+            "seconds": time.perf_counter() - self.started - self.idle,
+            "phases": self.phases,
+            "counters": self.counters,
+        }
+        if self.profile is not None:
+            self.profile.disable()
+            profile_path = os.path.join(directory, PROFILE_NAME)
+            rollback.protect(profile_path)
+            self.profile.dump_stats(profile_path)
+            stats = pstats.Stats(self.profile).sort_stats("cumulative")
+            report["profile"] = profile_path
+            report["hot_spots"] = [
+                {
+                    "function": "{}:{}({})".format(*func),
+                    "calls": calls,
+                    "seconds": total,
+                    "cumulative": cumulative,
+                }
+                for func, (_, calls, total, cumulative, _) in sorted(
+                    stats.stats.items(), key=lambda item: -item[1][3]
+                )[:20]
+            ]
+            self.profile = None
+
+        report_path = os.path.join(directory, REPORT_NAME)
+        rollback.protect(report_path)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=1)
+        return report
+
+
+profiler = ExportProfile()
+
+
+def material_image(material):
+    """Image of the first image texture node of a material, or None."""
+    if material.node_tree is None:
+        return None
+    for node in material.node_tree.nodes:
+        if node.type == "TEX_IMAGE" and node.image is not None:
+            return node.image
+    return None
+
+
+def texture_name(image):
+    """Texture name from the image name; TextureExport makes it unique."""
+    return Path(image.name).stem
+
+
+def image_is_linear(image):
+    """Whether the pixels of an image hold linear color.
+
+    Float images are stored in linear color whatever their file was.
+    Non-color data, such as normal maps, is written unchanged.
+    """
+    colorspace = image.colorspace_settings.name
+    if colorspace in ("Non-Color", "Raw"):
+        return False
+    return image.is_float or colorspace.startswith("Linear")
+
+
+def image_digest(image, settings):
+    """Hash of the image source and the conversion settings.
+
+    Hashes the image file or packed data, which is much smaller than
+    the pixels. Generated images and images edited since they were last
+    saved or packed differ from that source, so they return None and
+    are always converted.
+    """
+    if image.is_dirty:
+        return None
+    digest = hashlib.sha1(json.dumps(settings, sort_keys=True).encode())
+    if image.packed_file is not None:
+        digest.update(image.packed_file.data)
+    elif image.source == "FILE" and os.path.isfile(bpy.path.abspath(image.filepath)):
+        with open(bpy.path.abspath(image.filepath), "rb") as f:
+            digest.update(f.read())
+    else:
+        return None
+    digest.update(str(tuple(image.size)).encode())
+    return digest.hexdigest()
+
+
+def read_image_pixels(image):
+    """(H, W, C) float32 pixels of an image, read in one call."""
+    width, height = image.size
+    if width == 0 or height == 0:
+        raise ValueError("image has no pixel data")
+    pixels = np.empty(width * height * image.channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, image.channels)
+
+
+class TextureJob:
+    """Pixels and target file handed to a worker"""
+
+    def __init__(self, name, path, pixels, digest, max_size, level, linear):
+        self.name = name
+        self.path = path
+        self.pixels = pixels
+        self.digest = digest
+        self.max_size = max_size
+        self.level = level
+        self.linear = linear
+
+
+def write_texture(job):
+    """Downscale, quantize and encode one texture. Runs in a worker thread.
+
+    Linear pixels are averaged before they are encoded as sRGB.
+    """
+    pixels = downscale(job.pixels, job.max_size)
+    if job.linear:
+        pixels = linear_to_srgb(pixels)
+    pixels = (np.clip(pixels, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+    # opaque RGBA is written as RGB
+    if pixels.shape[2] == 4 and (pixels[..., 3] == 255).all():
+        pixels = pixels[..., :3]
+    rollback.protect(job.path)
+    write_png(job.path, np.ascontiguousarray(pixels), job.level)
+    job.pixels = None
+    return job
+
+
+class ExportObj:
+    meshes = []
+    hits = 0
+    misses = 0
+    errors = {}
+    depsgraph = None
+    cache = None
+
+    def begin(self, changed=None):
+        """Reset counters and open the mesh cache for a new export.
+
+        changed is the set of changed object names for an incremental
+        export; hulls and fits of other objects are kept. A full export,
+        also one forced by changed settings, fits and builds them anew.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.errors = {}
+        self.depsgraph = bpy.context.evaluated_depsgraph_get()
+        self.cache = None
+        if scene.my_tool.export_files and scene.my_tool.use_mesh_cache:
+            self.cache = MeshCache(file.path)
+
+        if changed is None:
+            hulls.clear()
+            primitives.clear()
+            return
+
+        for name in changed:
+            primitives.fits.pop(name, None)
+            obj = bpy.data.objects.get(name)
+            if obj is not None and obj.type == "MESH":
+                hulls.pieces.pop(mesh_file_stem(obj), None)
+
+    def prepare_obj(self, file_path, obj, depsgraph, cache=None):
+        """Pull mesh data on the main thread and return a write job."""
+        if index.record(obj).primitive != "mesh" or obj.type != "MESH":
+            return None
+
+        mesh_format = scene.my_tool.mesh_format
+        stem = mesh_file_stem(obj)
+        data = read_mesh_data(obj, depsgraph, stem)
+        file_name = mesh_file_name(stem)
+        mesh_path = Path(file_path) / file_name
+
+        if cache is None:
+            return MeshJob(stem, mesh_path, data, None, mesh_format)
+
+        digest = mesh_digest(data, {"format": mesh_format})
+        if cache.is_current(stem, digest, file_name):
+            self.hits += 1
+            return None
+
+        source = cache.find(digest)
+        if source is not None and source != mesh_path:
+            rollback.protect(mesh_path)
+            shutil.copyfile(source, mesh_path)
+            cache.store(stem, digest, file_name)
+            self.misses += 1
+            profiler.count("mesh_bytes", mesh_path.stat().st_size)
+            return None
+
+        return MeshJob(stem, mesh_path, data, digest, mesh_format)
+
+    def export(self, changed=None):
+        """Write mesh files.
+
+        When changed is given, only meshes of those objects and meshes
+        with no file yet are written.
+        """
+        for _ in self.export_steps(changed):
+            pass
+
+    def export_steps(self, changed=None):
+        """export, yielding the fraction of meshes done after each mesh.
+
+        Closing the generator cancels the meshes not started yet.
+        """
+        if not scene.my_tool.export_files:
+            return
+
+        depsgraph = self.depsgraph
+        cache = self.cache
+
+        # one file per mesh datablock, however many objects use it
+        unique_meshes = {}
+        for mesh in self.meshes:
+            if mesh.type != "MESH" or primitives.fit(mesh) is not None:
+                continue
+            if hulls.enabled(mesh) and hulls.assets(mesh):
+                continue
+            unique_meshes.setdefault(mesh_file_stem(mesh), mesh)
+
+        jobs = []
+        for count, (stem, mesh) in enumerate(unique_meshes.items(), 1):
+            yield 0.5 * count / len(unique_meshes)
+            if (
+                changed is not None
+                and mesh.name not in changed
+                and (Path(file.path) / mesh_file_name(stem)).is_file()
+            ):
+                self.hits += 1
+                continue
+
+            try:
+                job = self.prepare_obj(file.path, mesh, depsgraph, cache)
+            except Exception as error:
+                self.errors[stem] = str(error)
+                continue
+            if job is not None:
+                jobs.append(job)
+        jobs.extend(hulls.take_jobs())
+
+        futures = {}
+        try:
+            for job in jobs:
+                futures[mesh_pool.submit(job)] = job
+            for count, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                try:
+                    mesh_pool.result(future, job)
+                except Exception as error:
+                    self.errors[job.name] = str(error)
+                    rollback.restore(job.path)
+                else:
+                    self.misses += 1
+                    profiler.count("mesh_vertices", len(job.data.vertices))
+                    profiler.count("mesh_bytes", job.path.stat().st_size)
+                    if cache is not None and job.digest is not None:
+                        cache.store(job.name, job.digest, job.path.name)
+                yield 0.5 + 0.5 * count / len(jobs)
+        finally:
+            # on cancel, wait for files being written so they can be undone
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+        if cache is not None:
+            hulls.store(cache, self.errors)
+            cache.prune(set(unique_meshes) | hulls.names())
+            cache.save()
+
+        print("Meshes: {} cached, {} written".format(self.hits, self.misses))
+        for name, error in self.errors.items():
+            print("Mesh {} failed: {}".format(name, error))
+
+
+class TextureExport:
+    """Images of exported materials, written as downscaled PNG files"""
+
+    images = []
+    names = {}
+    hits = 0
+    misses = 0
+    errors = {}
+
+    def begin(self):
+        """Collect the images used by exported materials and name them.
+
+        Images whose names differ only by extension, such as wood.png
+        and wood.jpg, get a numbered suffix so their files do not clash.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.errors = {}
+        self.images = []
+        for material in index.materials:
+            if material.name in ("Dots Stroke", "collision"):
+                continue
+            image = material_image(material)
+            if image is not None and image not in self.images:
+                self.images.append(image)
+
+        self.names = {}
+        taken = set()
+        for image in self.images:
+            name = base = texture_name(image)
+            suffix = 1
+            while name in taken:
+                name = "{}_{}".format(base, suffix)
+                suffix += 1
+            taken.add(name)
+            self.names[image.name] = name
+
+    def name(self, image):
+        return self.names.get(image.name) or texture_name(image)
+
+    def file_name(self, image):
+        return self.name(image) + ".png"
+
+    def export(self):
+        for _ in self.export_steps():
+            pass
+
+    def export_steps(self):
+        """Write the textures, yielding the fraction done after each one.
+
+        Pixels are read on the main thread; resizing and encoding run in
+        worker threads, with at most one image per worker in memory.
+        """
+        mytool = scene.my_tool
+        if not mytool.export_textures:
+            return
+
+        cache = None
+        if mytool.use_texture_cache:
+            cache = MeshCache(file.path, TEXTURE_MANIFEST_NAME)
+
+        workers = mytool.texture_workers or os.cpu_count()
+        pool = ThreadPoolExecutor(max_workers=workers)
+        running = {}
+        done = 0
+        try:
+            for image in self.images:
+                name = self.name(image)
+                file_name = self.file_name(image)
+                try:
+                    linear = image_is_linear(image)
+                    settings = {
+                        "max_size": mytool.texture_max_size,
+                        "level": mytool.texture_compression,
+                        "linear": linear,
+                    }
+                    digest = image_digest(image, settings)
+                    if cache is not None and digest is not None:
+                        if cache.is_current(name, digest, file_name):
+                            self.hits += 1
+                            done += 1
+                            yield done / len(self.images)
+                            continue
+                    job = TextureJob(
+                        name,
+                        Path(file.path) / file_name,
+                        read_image_pixels(image),
+                        digest,
+                        mytool.texture_max_size,
+                        mytool.texture_compression,
+                        linear,
+                    )
+                except Exception as error:
+                    self.errors[name] = str(error)
+                    done += 1
+                    continue
+
+                if len(running) >= workers:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self.collect(running.pop(future), future, cache)
+                        done += 1
+                        yield done / len(self.images)
+                running[pool.submit(write_texture, job)] = job
+
+            for future in as_completed(running):
+                self.collect(running[future], future, cache)
+                done += 1
+                yield done / len(self.images)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        if cache is not None:
+            cache.prune({self.name(image) for image in self.images})
+            cache.save()
+
+        print("Textures: {} cached, {} written".format(self.hits, self.misses))
+        for name, error in self.errors.items():
+            print("Texture {} failed: {}".format(name, error))
+
+    def collect(self, job, future, cache):
+        try:
+            future.result()
+        except Exception as error:
+            self.errors[job.name] = str(error)
+            rollback.restore(job.path)
+            return
+        self.misses += 1
+        profiler.count("texture_bytes", job.path.stat().st_size)
+        if cache is not None and job.digest is not None:
+            cache.store(job.name, job.digest, job.path.name)
+
+
+def world_matrices(objects):
+    """(N, 4, 4) world matrices of a collection of objects, read in one call."""
+    matrices = np.empty(len(objects) * 16, dtype=np.float32)
+    objects.foreach_get("matrix_world", matrices)
+    # Blender stores matrices column by column
+    return matrices.reshape(-1, 4, 4).transpose(0, 2, 1).astype(np.float64)
+
+
+class ObjectRecord:
+    """Export data of one object, read once per export.
+
+    pos, euler and rotation are the object transform in its parent space,
+    set by SceneIndex.
+    """
+
+    def __init__(self, obj):
+        properties = obj.properties
+        self.obj = obj
+        self.name = obj.name
+        self.type = obj.type
+        self.parent = obj.parent
+        self.mujoco_type = properties.mujoco_type
+        self.primitive = properties.primitive
+        self.is_collision = properties.is_collision
+        self.mujoco_joint = properties.mujoco_joint
+        self.mujoco_joint_name = properties.mujoco_joint_name
+        self.joint_type = properties.joint_type
+        self.joint_direction = properties.joint_direction
+        self.joint_range_min = properties.joint_range_min
+        self.joint_range_max = properties.joint_range_max
+        self.scale = obj.scale.copy()
+        self.pos = None
+        self.euler = None
+        self.rotation = None
+        self.data_name = obj.data.name if obj.data is not None else None
+
+        self.material = None
+        materials = getattr(obj.data, "materials", None)
+        if materials and materials[0] is not None:
+            self.material = materials[0].name
+
+
+class SceneIndex:
+    """Records of every object, built in a single pass over the scene.
+
+    Emitters read children, properties and transforms from here instead
+    of scanning bpy.data.objects or walking obj.children again.
+    """
+
+    records = {}
+    child_lists = {}
+    joints = []
+    mesh_geoms = []
+    materials = []
+    images = []
+
+    def build(self):
+        self.records = {}
+        self.child_lists = {}
+        self.joints = []
+        self.mesh_geoms = []
+
+        objects = bpy.data.objects
+        for obj in objects:
+            record = ObjectRecord(obj)
+            self.records[obj.name] = record
+
+            if record.parent is not None:
+                self.child_lists.setdefault(record.parent.name, []).append(obj)
+            if record.mujoco_joint:
+                self.joints.append(obj)
+            if (
+                record.mujoco_type in ("GEOM", "COLLISION")
+                and record.primitive == "mesh"
+                and record.type == "MESH"
+            ):
+                self.mesh_geoms.append(obj)
+
+        self.materials = list(bpy.data.materials)
+        self.images = list(bpy.data.images)
+
+        records = list(self.records.values())
+        if not records:
+            return
+        world = world_matrices(objects)
+        rows = {record.name: row for row, record in enumerate(records)}
+        parent_rows = np.array(
+            [rows[r.parent.name] if r.parent else -1 for r in records],
+            dtype=np.int64,
+        )
+        parent_world = np.tile(np.eye(4), (len(records), 1, 1))
+        has_parent = parent_rows >= 0
+        parent_world[has_parent] = world[parent_rows[has_parent]]
+        self.set_poses(records, world, parent_world)
+
+    def set_poses(self, records, world, parent_world):
+        """Fill pos, euler and rotation of records from (N, 4, 4) matrices."""
+        positions, rotations, eulers = local_poses(world, parent_world)
+        for record, pos, rotation, euler in zip(
+            records, positions.tolist(), rotations, eulers.tolist()
+        ):
+            record.pos = tuple(pos)
+            record.euler = tuple(euler)
+            record.rotation = rotation
+
+    def record(self, obj):
+        record = self.records.get(obj.name)
+        if record is None or record.obj != obj:
+            record = ObjectRecord(obj)
+            self.records[obj.name] = record
+
+            world = np.array([obj.matrix_world], dtype=np.float64)
+            parent_world = np.eye(4)[np.newaxis]
+            if obj.parent is not None:
+                parent_world = np.array([obj.parent.matrix_world], dtype=np.float64)
+            self.set_poses([record], world, parent_world)
+        return record
+
+    def children(self, obj):
+        return self.child_lists.get(obj.name, [])
+
+
+class BlenderObject:
+    def __init__(self, obj):
+        self.obj = obj
+        self.record = index.record(obj)
+
+    def primitive_size(self):
+        """Size of a primitive geom from the object scale."""
+        primitive = self.record.primitive
+        scale = self.record.scale
+        if primitive == "box" or primitive == "ellipsoid":
+            return tuple(scale)
+        if primitive == "cylinder" or primitive == "capsule":
+            return tuple(scale[1:3])
+        if primitive == "sphere":
+            return (scale[0],)
+        return None
+
+    def geom_model(self):
+        """Geom of a Geometry or Collision object, in its parent space."""
+        record = self.record
+        geom = Geom()
+
+        if record.mujoco_type == "GEOM" and record.primitive == "mesh":
+            geom.mesh = mesh_asset(self.obj)[0]
+
+        if record.mujoco_type == "GEOM":
+            geom.type = record.primitive
+            geom.euler = record.euler
+            geom.pos = record.pos
+            geom.material = record.material
+            geom.size = self.primitive_size()
+
+        if record.mujoco_type == "COLLISION" or record.is_collision == True:
+            geom.type = record.primitive
+            geom.euler = record.euler
+            geom.pos = record.pos
+            geom.class_name = "collision"
+
+            if record.primitive == "mesh":
+                geom.mesh = mesh_asset(self.obj)[0]
+            geom.size = self.primitive_size()
+
+        return geom
+
+    def joint_axis(self):
+        if self.obj.joint_axis == "X":
+            return "1 0 0"
+        elif self.obj.joint_axis == "Y":
+            return "0 1 0"
+        else:
+            return "0 0 1"
+
+
+def radians_to_degrees(degree):
+    radian = degree / 57.32
+    return radian
+
+
+def joint_name(obj):
+    """Name of the joint of obj, {name}_joint unless one is set."""
+    joint_name = index.record(obj).mujoco_joint_name
+    if joint_name == "joint" or joint_name == "" or joint_name == None:
+        joint_name = obj.name + "_" + "joint"
+    return joint_name
+
+
+class XML:
+    worldbody = ""
+
+    def __init__(self, root):
+        self.root = root
+        self.bodies = {}
+        self.worldbodies = {}
+        self.files = []
+
+    def add_attribute(self, body, attribute_name, attribute):
+        body.set(attribute_name, attribute)
+
+    def pretty(self, root):
+        return ET.ElementTree(root)
+
+    def write_main_xml(self, cached=None):
+        """Write the XML file of every root link.
+
+        With a cached XML from the previous export, the worldbody is
+        reused and only bodies of changed objects are rebuilt.
+        """
+        for _ in self.write_main_xml_steps(cached):
+            pass
+        return {"FINISHED"}
+
+    def write_main_xml_steps(self, cached=None):
+        """write_main_xml, yielding after each body is built."""
+        mytool = scene.my_tool
+        ExportObj.meshes.clear()
+        if cached is not None:
+            self.bodies = cached.bodies
+            self.worldbodies = cached.worldbodies
+            with profiler.phase("body_link"):
+                self.patch_bodies()
+
+        for record in index.records.values():
+            obj = record.obj
+            if record.primitive == "mesh" and mytool.export_files == True:
+                ExportObj.meshes.append(obj)
+
+            if record.mujoco_type == "LINK" and record.parent == None:
+                file_name = file.path + obj.name + ".xml"
+
+                self.add_attribute(self.root, "model", file.name)
+                with profiler.phase("depend_link"):
+                    model, text = self.write_depend_link(obj)
+
+                # asset = ET.SubElement(
+                #     self.worldbody, "include", file="assets/" + obj.name + ".xml"
+                # )
+
+                # include = ET.SubElement(
+                #     self.worldbody,
+                #     "include",
+                #     file="assets/" + file.name + "_dependencies.xml",
+                # )
+
+                if cached is not None:
+                    self.worldbody = self.worldbodies[obj.name]
+                    self.root.append(self.worldbody)
+                else:
+                    with profiler.phase("body_link"):
+                        model.body = yield from self.body_tree(obj)
+                        text.add(body_items(model.body))
+                        self.worldbody = emit_worldbody(
+                            self.root, model, self.bodies, text
+                        )
+                    self.worldbodies[obj.name] = self.worldbody
+
+                # floor = ET.SubElement(worldbody, "geom", name = 'floor', size = '10 10 .0075', type = 'plane',  condim = '3')
+
+                with profiler.phase("xml_write"):
+                    tree = self.pretty(self.root)
+                    rollback.protect(file_name)
+                    tree.write(file_name, pretty_print=True)
+                self.files.append(file_name)
+                profiler.count("xml_bytes", os.path.getsize(file_name))
+
+    def stream_main_xml(self):
+        """Write the XML of every root link while walking the hierarchy.
+
+        Sections are written to the file as soon as they are built, and
+        only one body is held in memory at a time, so memory use does
+        not grow with the number of bodies.
+        """
+        for _ in self.stream_main_xml_steps():
+            pass
+        return {"FINISHED"}
+
+    def stream_main_xml_steps(self):
+        """stream_main_xml, yielding after each body is written."""
+        mytool = scene.my_tool
+        ExportObj.meshes.clear()
+        self.bodies = None
+
+        for record in index.records.values():
+            obj = record.obj
+            if record.primitive == "mesh" and mytool.export_files == True:
+                ExportObj.meshes.append(obj)
+
+            if record.mujoco_type == "LINK" and record.parent == None:
+                file_name = file.path + obj.name + ".xml"
+
+                self.files.append(file_name)
+                rollback.protect(file_name)
+                with ET.xmlfile(file_name, encoding="utf-8") as xf:
+                    xf.write_declaration()
+                    with xf.element("mujoco", model=file.name):
+                        self.root = ET.Element("mujoco")
+                        with profiler.phase("depend_link"):
+                            model, text = self.write_depend_link(
+                                obj, with_actuators=False
+                            )
+                        self.flush(xf, self.root)
+
+                        with xf.element("worldbody"):
+                            self.worldbody = ET.Element("worldbody")
+                            emit_lights(self.worldbody, model, text)
+                            self.flush(xf, self.worldbody)
+
+                            with xf.element("body", attrib={"childclass": obj.name}):
+                                with profiler.phase("body_link"):
+                                    yield from self.stream_body(xf, obj)
+
+                        with xf.element("actuator"):
+                            actuators = ET.Element("actuator")
+                            for actuator in model.actuators:
+                                emit_actuator(actuators, actuator, text)
+                                self.flush(xf, actuators)
+                profiler.count("xml_bytes", os.path.getsize(file_name))
+
+    def stream_body(self, xf, obj):
+        """Write one body, then its child bodies inside it.
+
+        The hierarchy is walked with an explicit stack, so deep chains do
+        not hit the recursion limit. Every open <body> element is held by
+        an ExitStack of its depth and closed once its subtree is written.
+        Yields after each body.
+        """
+        depths = []
+        stack = [(obj, 0)]
+        try:
+            while stack:
+                obj, depth = stack.pop()
+                while len(depths) > depth:
+                    depths.pop().close()
+
+                holder = ET.Element("body")
+                body = self.mujoco_body_link(holder, obj, recurse=False)
+                level = ExitStack()
+                depths.append(level)
+                level.enter_context(xf.element("body", attrib=dict(body.attrib)))
+                self.flush(xf, body)
+                yield
+
+                children = [
+                    child
+                    for child in index.children(obj)
+                    if index.record(child).mujoco_type == "LINK"
+                ]
+                stack.extend((child, depth + 1) for child in reversed(children))
+        finally:
+            while depths:
+                depths.pop().close()
+
+    def flush(self, xf, element):
+        """Write the children of element to the file and drop them."""
+        for child in element:
+            xf.write(child, pretty_print=True)
+        element.clear()
+
+    def patch_bodies(self):
+        """Rebuild the bodies of changed objects in the cached tree."""
+        for obj in tracker.changed_bodies():
+            old_body = self.bodies[obj.name]
+
+            holder = ET.Element("body")
+            body = self.mujoco_body_link(holder, obj, recurse=False)
+
+            # child bodies are unchanged, move them over
+            for child_body in old_body.findall("body"):
+                body.append(child_body)
+            old_body.getparent().replace(old_body, body)
+
+    def model_header(self, obj):
+        """Model of the root link obj, with assets, actuators and lights.
+
+        The body tree is left empty; see body_model.
+        """
+        model = Model(file.name, obj.name)
+
+        for material in index.materials:
+            if material.name != "Dots Stroke" and material.name != "collision":
+                model.materials.append(
+                    Material(
+                        material.name,
+                        material.specular_intensity,
+                        tuple(material.diffuse_color),
+                        self.get_material_texture(material),
+                    )
+                )
+
+        if scene.my_tool.export_textures:
+            for image in textures.images:
+                model.textures.append(
+                    Texture(textures.name(image), textures.file_name(image))
+                )
+        else:
+            for image in index.images:
+                if ".png" in image.name:
+                    model.textures.append(Texture(image.name[:-4], image.name))
+
+        # within all 3d models
+        mesh_assets = set()
+        for mesh_obj in index.mesh_geoms:
+            if primitives.fit(mesh_obj) is None:
+                obj_assets = hulls.assets(mesh_obj) if hulls.enabled(mesh_obj) else []
+                for asset_name, file_name, scale in obj_assets or [
+                    mesh_asset(mesh_obj)
+                ]:
+                    if asset_name not in mesh_assets:
+                        mesh_assets.add(asset_name)
+                        model.meshes.append(MeshAsset(asset_name, file_name, scale))
+
+        for joint_obj in index.joints:
+            actuator = self.actuator_model(joint_obj)
+            if actuator is not None:
+                model.actuators.append(actuator)
+
+        record = index.record(obj)
+        if obj.type == "LIGHT":
+            model.lights.append(
+                Light(
+                    "false",
+                    record.pos,
+                    (-1, -1, -1),
+                    tuple(obj.data.color),
+                    mode="targetbodycom",
+                    target=obj.name,
+                )
+            )
+        else:
+            model.lights.extend(DEFAULT_LIGHTS)
+
+        if obj.type == "CAMERA":
+            model.cameras.append(Camera("targeting", record.pos, file.name))
+
+        return model
+
+    def get_material_texture(self, material):
+        image = material_image(material)
+        if image is not None:
+            return textures.name(image)
+
+    def joint_model(self, obj):
+        record = index.record(obj)
+
+        if record.joint_direction == "X":
+            axis = (1, 0, 0)
+        if record.joint_direction == "Y":
+            axis = (0, 1, 0)
+        if record.joint_direction == "Z":
+            axis = (0, 0, 1)
+
+        range = None
+        if record.joint_type == "HINGE":
+            range = (
+                round(radians_to_degrees(record.joint_range_min), 4),
+                round(radians_to_degrees(record.joint_range_max), 4),
+            )
+        elif record.joint_type == "SLIDE":
+            range = (record.joint_range_min, record.joint_range_max)
+
+        return Joint(joint_name(obj), axis, record.joint_type, range)
+
+    def actuator_model(self, obj):
+        """Position actuator for the joint of obj, or None."""
+        record = index.record(obj)
+        if record.mujoco_joint != True:
+            return None
+
+        ctrlrange = None
+        if record.joint_type == "HINGE":
+            ctrlrange = (
+                round(radians_to_degrees(record.joint_range_min), 3),
+                round(radians_to_degrees(record.joint_range_max), 3),
+            )
+        elif record.joint_type == "SLIDE":
+            ctrlrange = (record.joint_range_min, record.joint_range_max)
+
+        return Actuator(obj.name, joint_name(obj), ctrlrange)
+
+    def body_model(self, obj, recurse=True):
+        """Body, Geom and Joint data of a link and, with recurse, its child links"""
+        site_count = 0
+        record = index.record(obj)
+        body = Body(obj.name, record.pos, record.euler)
+
+        if record.mujoco_joint == True:
+            body.joint = self.joint_model(obj)
+
+        for child in index.children(obj):
+            blend_child = BlenderObject(child)
+            child_record = blend_child.record
+            geom = blend_child.geom_model()
+
+            # fitted primitive replaces the collision mesh
+            if primitives.fit(child) is not None:
+                primitives.fit_geom(geom, child)
+
+            # make sure object has materials
+            if child.type == "EMPTY" or child_record.primitive == None:
+                pass
+            elif child_record.material:
+                geom.material = child_record.material
+
+            if (
+                child_record.mujoco_type == "GEOM"
+                or child_record.mujoco_type == "COLLISION"
+            ):
+                hull_assets = hulls.assets(child) if hulls.enabled(child) else []
+                for asset_name, hull_file, hull_scale in hull_assets:
+                    body.geoms.append(
+                        Geom(
+                            geom.type,
+                            asset_name,
+                            geom.euler,
+                            geom.pos,
+                            geom.size,
+                            geom.class_name,
+                            geom.material,
+                        )
+                    )
+
+                if not hull_assets:
+                    body.geoms.append(geom)
+
+            # Add site
+            if child_record.mujoco_type == "site":
+                body.sites.append(
+                    Site(
+                        child.name + str(site_count),
+                        child_record.pos,
+                        (child_record.scale[0],),
+                    )
+                )
+                site_count += 1
+
+        profiler.count("bodies")
+        profiler.count("geoms", len(body.geoms))
+
+        # Additional loop added for correct ordering in xml
+        if recurse:
+            for child in index.children(obj):
+                if index.record(child).mujoco_type == "LINK":
+                    body.bodies.append(self.body_model(child))
+
+        return body
+
+    def body_tree(self, obj):
+        """Build the Body of obj and of all its child links.
+
+        Yields after each body and returns the Body of obj.
+        """
+        root = self.body_model(obj, recurse=False)
+        stack = [(obj, root)]
+        while stack:
+            link, body = stack.pop()
+            yield
+            for child in index.children(link):
+                if index.record(child).mujoco_type == "LINK":
+                    child_body = self.body_model(child, recurse=False)
+                    body.bodies.append(child_body)
+                    stack.append((child, child_body))
+        return root
+
+    def mujoco_body_link(self, previous_body, obj, recurse=True):
+        """Create Body, Geom and Joint data in XML"""
+        body = self.body_model(obj, recurse)
+        text = format_body(body, scene.my_tool.precision, recurse)
+        return emit_body(previous_body, body, recurse, self.bodies, text)
+
+    def write_depend_link(self, obj, with_actuators=True):
+        """Write compiler, assets, defaults and actuators into the root.
+
+        Returns the model, without its body tree, and its FieldStrings.
+        """
+        model = self.model_header(obj)
+        text = format_model(model, scene.my_tool.precision)
+        emit_header(self.root, model, with_actuators, text)
+        return model, text
+
+
+class ChangeTracker:
+    """Objects changed since the last export.
+
+    Filled by a depsgraph_update_post handler while incremental export
+    is enabled, and holds the XML of the last export for patching.
+    """
+
+    objects = set()
+    geometry = set()
+    meshes = set()
+    pending = (set(), set(), set())
+    xml = None
+    path = None
+    structure = None
+
+    def reset(self):
+        self.objects = set()
+        self.geometry = set()
+        self.meshes = set()
+        self.pending = (set(), set(), set())
+        self.xml = None
+
+    def take(self):
+        """Hand the changes recorded so far to the export about to run.
+
+        Changes recorded while a modal export runs are kept for the next.
+        """
+        self.pending = (self.objects, self.geometry, self.meshes)
+        self.objects = set()
+        self.geometry = set()
+        self.meshes = set()
+
+    def record(self, update):
+        data = update.id.original
+        if isinstance(data, bpy.types.Object):
+            self.objects.add(data.name)
+            if update.is_updated_geometry:
+                self.geometry.add(data.name)
+        elif isinstance(data, bpy.types.Mesh):
+            self.meshes.add(data.name)
+
+    def snapshot(self):
+        """Names, parents and types, which decide the XML structure.
+
+        Paired with the export settings, as changing them invalidates
+        the XML, the fitted primitives and the hulls of the last export.
+        """
+        mytool = scene.my_tool
+        settings = tuple(getattr(mytool, name) for name in PATCH_SETTINGS)
+        return settings, {
+            record.name: (
+                record.parent.name if record.parent else None,
+                record.mujoco_type,
+                record.primitive,
+            )
+            for record in index.records.values()
+        }
+
+    def links(self):
+        return {
+            record.obj
+            for record in index.records.values()
+            if record.mujoco_type == "LINK"
+        }
+
+    def mesh_users(self):
+        """Objects using a mesh datablock that changed."""
+        return {
+            record.name
+            for record in index.records.values()
+            if record.type == "MESH" and record.data_name in self.pending[2]
+        }
+
+    def changed_objects(self):
+        return self.pending[0] | self.mesh_users()
+
+    def changed_geometry(self):
+        return self.pending[1] | self.mesh_users()
+
+    def changed_bodies(self):
+        """Links whose body element has to be rebuilt."""
+        links = self.links()
+        bodies = set()
+        for name in self.changed_objects():
+            obj = bpy.data.objects.get(name)
+            if obj in links:
+                bodies.add(obj)
+            elif obj is not None and obj.parent in links:
+                bodies.add(obj.parent)
+        return bodies
+
+    def can_patch(self):
+        """Whether the last export can be patched instead of rebuilt."""
+        return (
+            scene.my_tool.incremental_export
+            and self.xml is not None
+            and self.path == file.path
+            and self.structure == self.snapshot()
+            and all(obj.name in self.xml.bodies for obj in self.changed_bodies())
+        )
+
+    def store(self, xml):
+        self.pending = (set(), set(), set())
+        self.xml = xml
+        self.path = file.path
+        self.structure = self.snapshot()
+
+
+# handlers are persistent, Blender removes the others when a file is loaded
+@persistent
+def track_changes(scene, depsgraph):
+    for update in depsgraph.updates:
+        tracker.record(update)
+
+
+def set_tracking(enabled):
+    handlers = bpy.app.handlers.depsgraph_update_post
+    if enabled and track_changes not in handlers:
+        handlers.append(track_changes)
+    elif not enabled and track_changes in handlers:
+        handlers.remove(track_changes)
+    tracker.reset()
+
+
+def update_incremental_export(self, context):
+    set_tracking(self.incremental_export)
+
+
+@persistent
+def load_file(*args):
+    """Forget the changes and XML of the previous file after a load.
+
+    Tracking follows the Incremental Export setting of the loaded scene.
+    """
+    global scene
+    scene = bpy.context.scene
+    set_tracking(scene.my_tool.incremental_export)
+
+
+class FileStructure:
+    def __init__(self, path):
+        self.path = path
+        self.name = ""
+        self.directory = ""
+
+    def file_name(self):
+        self.name = Path(self.path).stem
+
+    def file_directory(self):
+        self.directory = Path(self.path).parent
+
+
+def export_scene(path):
+    """Export the scene to the directory path with the scene.my_tool settings.
+
+    Files the export replaces are backed up until it finishes, so a mesh
+    or texture write that fails keeps the previous file, and an export
+    that raises puts every file back. Returns a summary of the files
+    written and mesh results.
+    """
+    rollback.begin(path)
+    steps = export_steps(path)
+    try:
+        while True:
+            next(steps)
+    except StopIteration as done:
+        rollback.commit()
+        return done.value
+    except BaseException:
+        abort_export(steps)
+        raise
+
+
+def abort_export(steps):
+    """Stop an export and put back the files it replaced."""
+    steps.close()
+    rollback.undo()
+    tracker.reset()
+    hulls.clear()
+    primitives.clear()
+
+
+def export_steps(path):
+    """export_scene, yielding (fraction done, stage) between units of work.
+
+    The modal operator runs a few steps per timer event so Blender stays
+    responsive; closing the generator stops the export.
+    """
+    mytool = scene.my_tool
+
+    file.path = path
+    file.file_directory()
+    file.file_name()
+
+    profiler.begin(mytool.profile_export)
+    with profiler.phase("scene_walk"):
+        index.build()
+    profiler.count("objects", len(index.records))
+    tracker.take()
+    textures.begin()
+
+    changed = None
+    cached = None
+    if mytool.stream_xml:
+        exporter.begin()
+        xml = XML(None)
+        xml_steps = xml.stream_main_xml_steps()
+    elif tracker.can_patch():
+        cached = tracker.xml
+        changed = tracker.changed_geometry()
+        exporter.begin(tracker.changed_objects())
+        xml = XML(ET.Element("mujoco"))
+    else:
+        exporter.begin()
+        xml = XML(ET.Element("mujoco"))
+    if not mytool.stream_xml:
+        xml_steps = xml.write_main_xml_steps(cached)
+
+    # fits and hulls first, they are the slowest part of building geoms
+    collision = [obj for obj in index.mesh_geoms if is_collision_mesh(obj)]
+    for count, obj in enumerate(collision, 1):
+        if primitives.fit(obj) is None and hulls.enabled(obj):
+            hulls.assets(obj)
+        yield 0.2 * count / len(collision), "Collision"
+
+    links = sum(1 for record in index.records.values() if record.mujoco_type == "LINK")
+    for count, _ in enumerate(xml_steps, 1):
+        yield 0.2 + 0.4 * min(count / max(links, 1), 1.0), "Bodies"
+
+    with profiler.phase("mesh_export"):
+        for fraction in exporter.export_steps(changed):
+            yield 0.6 + 0.3 * fraction, "Meshes"
+
+    with profiler.phase("texture_export"):
+        for fraction in textures.export_steps():
+            yield 0.9 + 0.1 * fraction, "Textures"
+
+    if mytool.incremental_export and not mytool.stream_xml:
+        tracker.store(xml)
+
+    profiler.count("meshes_cached", exporter.hits)
+    profiler.count("meshes_written", exporter.misses)
+    profiler.count("textures_cached", textures.hits)
+    profiler.count("textures_written", textures.misses)
+    report = profiler.finish(file.path)
+
+    return {
+        "files": xml.files,
+        "meshes_cached": exporter.hits,
+        "meshes_written": exporter.misses,
+        "textures_cached": textures.hits,
+        "textures_written": textures.misses,
+        "errors": dict(exporter.errors, **textures.errors),
+        "report": report,
+    }
+
+
+class MUJOCO_BUTTON(Operator):
+    """Exports XML file in Mujoco format."""
+
+    bl_idname = "mujoco_panel.button"
+    bl_label = "Export XML"
+
+    # ExportHelper mixin class uses this
+    # filename_ext = ".xml"
+
+    # filter_glob: StringProperty(
+    #     default="*.xml",
+    #     options={"HIDDEN"},
+    #     maxlen=255,  # Max internal buffer length, longer would be clamped.
+    # )
+    # split_files: BoolProperty(
+    #     name="Export Separate Files",
+    #     description="Split multiple objects into separate xml files",
+    #     default=False,
+    # )
+
+    steps = None
+    timer = None
+
+    def execute(self, context):
+        export_scene(bpy.path.abspath(scene.my_tool.my_path))
+        self.report_result()
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        """Run the export in time slices, cancelled with Esc."""
+        wm = context.window_manager
+        path = bpy.path.abspath(scene.my_tool.my_path)
+        rollback.begin(path)
+        self.steps = export_steps(path)
+        self.timer = wm.event_timer_add(MODAL_SLICE, window=context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        if event.type == "ESC":
+            self.cancel(context)
+            self.report({"WARNING"}, "Export cancelled, files restored")
+            return {"CANCELLED"}
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        deadline = time.perf_counter() + MODAL_SLICE
+        profiler.resume()
+        try:
+            while time.perf_counter() < deadline:
+                fraction, stage = next(self.steps)
+        except StopIteration:
+            rollback.commit()
+            self.finish(context)
+            self.report_result()
+            return {"FINISHED"}
+        except Exception as error:
+            self.cancel(context)
+            self.report({"ERROR"}, "Export failed: {}".format(error))
+            return {"CANCELLED"}
+        finally:
+            profiler.pause()
+
+        context.window_manager.progress_update(int(fraction * 100))
+        context.workspace.status_text_set(
+            "Mujoco export: {} {:.0%} (Esc to cancel)".format(stage, fraction)
+        )
+        return {"PASS_THROUGH"}
+
+    def cancel(self, context):
+        """Stop the export and put back the files it replaced."""
+        abort_export(self.steps)
+        self.finish(context)
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self.steps = None
+
+    def report_result(self):
+        mytool = scene.my_tool
+        if mytool.export_files:
+            self.report(
+                {"INFO"},
+                "Meshes: {} cached, {} written".format(exporter.hits, exporter.misses),
+            )
+        if exporter.errors:
+            self.report(
+                {"WARNING"},
+                "{} meshes failed: {}".format(
+                    len(exporter.errors), ", ".join(sorted(exporter.errors))
+                ),
+            )
+        if mytool.export_textures:
+            self.report(
+                {"INFO"},
+                "Textures: {} cached, {} written".format(
+                    textures.hits, textures.misses
+                ),
+            )
+        if textures.errors:
+            self.report(
+                {"WARNING"},
+                "{} textures failed: {}".format(
+                    len(textures.errors), ", ".join(sorted(textures.errors))
+                ),
+            )
+
+
+class MUJOCO_PT_PANEL(bpy.types.Panel):
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Mujcoo"
+    bl_label = "Mujcoo Export"
+    bl_context = "objectmode"
+
+    def draw(self, context):
+        layout = self.layout
+
+        obj = context.object
+        scn = context.scene
+        mytool = scn.my_tool
+        obj_data = obj.properties
+
+        layout.use_property_split = True
+        layout.use_property_decorate = False  # No animation.
+
+        col = layout.column()
+
+        subcol = col.column()
+
+        layout.prop(obj, "name")
+        layout.prop(obj_data, "mujoco_type")
+        if obj_data.mujoco_type == "COLLISION":
+            layout.prop(obj_data, "primitive")
+        elif obj_data.mujoco_type == "GEOM":
+            layout.prop(obj_data, "primitive")
+            layout.prop(obj_data, "is_collision")
+        elif obj_data.mujoco_type == "LINK":
+            layout.prop(obj_data, "mujoco_joint")
+        if obj_data.mujoco_joint == True:
+            layout.prop(obj_data, "joint_type")
+            layout.prop(obj_data, "mujoco_joint_name")
+            layout.prop(obj_data, "joint_direction")
+            layout.prop(
+                obj_data,
+                "joint_range_min",
+            )
+            layout.prop(obj_data, "joint_range_max")
+
+        layout.prop(mytool, "export_files")
+        if mytool.export_files:
+            layout.prop(mytool, "mesh_format")
+            layout.prop(mytool, "use_mesh_cache")
+            layout.prop(mytool, "mesh_workers")
+            layout.prop(mytool, "fit_primitives")
+            if mytool.fit_primitives:
+                layout.prop(mytool, "fit_tolerance")
+            layout.prop(mytool, "collision_hulls")
+            if mytool.collision_hulls != "NONE":
+                layout.prop(mytool, "hull_max_vertices")
+            if mytool.collision_hulls == "DECOMPOSE":
+                layout.prop(mytool, "hull_max_pieces")
+
+        layout.prop(mytool, "export_textures")
+        if mytool.export_textures:
+            layout.prop(mytool, "texture_max_size")
+            layout.prop(mytool, "texture_compression")
+            layout.prop(mytool, "use_texture_cache")
+            layout.prop(mytool, "texture_workers")
+
+        layout.prop(mytool, "stream_xml")
+        if not mytool.stream_xml:
+            layout.prop(mytool, "incremental_export")
+
+        layout.prop(mytool, "precision")
+        layout.prop(mytool, "profile_export")
+        layout.prop(mytool, "my_path")
+
+        layout.operator("mujoco_panel.button")
+
+        if profiler.phases:
+            box = layout.box()
+            box.label(text="Last Export")
+            for name, seconds in profiler.phases.items():
+                box.label(text="{}: {:.3f} s".format(name, seconds))
+            for name, value in profiler.counters.items():
+                box.label(text="{}: {}".format(name, value))
+
+
+class MyObjectProperties(PropertyGroup):
+    is_collision: BoolProperty(
+        name="Is Collision", description="Mesh is collision", default=False
+    )
+
+    mujoco_joint: BoolProperty(
+        name="Mujoco Joint", description="Adds Mujoco joint", default=False
+    )
+
+    mujoco_type: EnumProperty(
+        name="Mujoco Type",
+        items=[
+            ("NONE", "None", "Not Specified"),
+            ("LINK", "Link", "Mujoco Body"),
+            ("GEOM", "Geometry", "Mesh Geometry"),
+            ("LIGHT", "Light", "Mujoco Light"),
+            ("COLLISION", "Collision", "Mujoco Primitive Collision"),
+            ("SITE", "Site", "Mujoco Site"),
+        ],
+    )
+
+    primitive: EnumProperty(
+        name="Primitive",
+        items=[
+            ("box", "Box", "Mujoco Box Primitive"),
+            ("mesh", "Mesh", "Mesh.obj"),
+            ("cylinder", "Cylinder", "Mujoco Cylinder Primitive"),
+            ("capsule", "Capsule", "Mujoco Capsule Primitive"),
+            ("sphere", "Sphere", "Mujoco Sphere Primitive"),
+            ("ellipsoid", "Ellipsoid", "Mujoco Ellipsoid Primitive"),
+        ],
+    )
+
+    joint_type: EnumProperty(
+        name="Joint Type",
+        items=[
+            ("HINGE", "Hinge", "Mujoco Hinge Joint"),
+            ("SLIDE", "Slide", "Mujoco Slide Joint"),
+            ("BALL", "Ball", "Mujoco Ball Joint"),
+        ],
+    )
+
+    joint_direction: EnumProperty(
+        name="ZYX",
+        items=[("X", "X", "X axis"), ("X", "Y", "Y axis"), ("X", "Z", "Z axis")],
+    )
+
+    mujoco_joint_name: StringProperty(
+        name="Joint Name", description="Name joint:", default="", maxlen=1024
+    )
+
+    joint_range_min: IntProperty(
+        name="Min Range",
+        description="Minimum range of joint",
+        default=0,
+    )
+
+    joint_range_max: IntProperty(
+        name="Max Range",
+        description="Maximum range of joint",
+        default=0,
+    )
+
+
+class MyProperties(PropertyGroup):
+    export_files: BoolProperty(
+        name="Export Mesh Files",
+        description="Exports mesh files with XML",
+        default=False,
+    )
+
+    mesh_format: EnumProperty(
+        name="Mesh Format",
+        items=[
+            ("OBJ", "OBJ", "Text OBJ with normals and UVs"),
+            ("STL", "Binary STL", "Binary STL, positions only"),
+            ("MSH", "MuJoCo MSH", "MuJoCo binary mesh with normals and UVs"),
+        ],
+    )
+
+    use_mesh_cache: BoolProperty(
+        name="Skip Unchanged Meshes",
+        description="Only rewrite meshes whose geometry changed since the last export",
+        default=True,
+    )
+
+    mesh_workers: IntProperty(
+        name="Mesh Workers",
+        description="Processes used to write mesh files, 0 uses every core",
+        default=0,
+        min=0,
+    )
+
+    fit_primitives: BoolProperty(
+        name="Fit Collision Primitives",
+        description="Replace collision meshes with a box, sphere, cylinder or capsule when one fits",
+        default=False,
+    )
+
+    fit_tolerance: FloatProperty(
+        name="Fit Tolerance",
+        description="Extra volume allowed over the convex hull of the mesh",
+        default=0.1,
+        min=0.0,
+    )
+
+    collision_hulls: EnumProperty(
+        name="Collision Hulls",
+        items=[
+            ("NONE", "Full Mesh", "Collide with the full mesh"),
+            ("HULL", "Convex Hull", "Collide with one convex hull"),
+            ("DECOMPOSE", "Decomposition", "Collide with several convex pieces"),
+        ],
+    )
+
+    hull_max_vertices: IntProperty(
+        name="Max Hull Vertices",
+        description="Maximum vertices in each collision hull",
+        default=32,
+        min=4,
+    )
+
+    hull_max_pieces: IntProperty(
+        name="Max Hull Pieces",
+        description="Maximum convex pieces per collision mesh",
+        default=8,
+        min=1,
+    )
+
+    export_textures: BoolProperty(
+        name="Export Textures",
+        description="Write the images of exported materials as PNG files",
+        default=False,
+    )
+
+    texture_max_size: IntProperty(
+        name="Max Texture Size",
+        description="Longest side of written textures in pixels, 0 keeps the original size",
+        default=1024,
+        min=0,
+    )
+
+    texture_compression: IntProperty(
+        name="Texture Compression",
+        description="PNG compression level, higher is smaller and slower",
+        default=6,
+        min=0,
+        max=9,
+    )
+
+    use_texture_cache: BoolProperty(
+        name="Skip Unchanged Textures",
+        description="Only convert textures whose image or settings changed since the last export",
+        default=True,
+    )
+
+    texture_workers: IntProperty(
+        name="Texture Workers",
+        description="Threads used to convert textures, 0 uses every core",
+        default=0,
+        min=0,
+    )
+
+    stream_xml: BoolProperty(
+        name="Stream XML",
+        description="Write the XML while walking the scene, for very large scenes",
+        default=False,
+    )
+
+    incremental_export: BoolProperty(
+        name="Incremental Export",
+        description="Track edits and only rebuild the bodies and meshes that changed",
+        default=False,
+        update=update_incremental_export,
+    )
+
+    precision: IntProperty(
+        name="Precision",
+        description="Decimal places of positions, angles, sizes and colors",
+        default=4,
+        min=1,
+        max=10,
+    )
+
+    profile_export: BoolProperty(
+        name="Profile Export",
+        description="Capture a cProfile of the export, written beside the XML",
+        default=False,
+    )
+
+    my_path: StringProperty(
+        name="Directory",
+        description="Choose a directory:",
+        default="",
+        maxlen=1024,
+        subtype="DIR_PATH",
+    )
+
+
+file = FileStructure(None)
+exporter = ExportObj()
+hulls = CollisionHulls()
+primitives = PrimitiveFits()
+textures = TextureExport()
+tracker = ChangeTracker()
+index = SceneIndex()
+
+# Class regiistration (Blender 2.8+)
+classes = (
+    MyProperties,
+    MyObjectProperties,
+    MUJOCO_PT_PANEL,
+    MUJOCO_BUTTON,
+)
+
+
+def register():
+    from bpy.utils import register_class
+
+    for cls in classes:
+        register_class(cls)
+
+    bpy.types.Scene.my_tool = PointerProperty(type=MyProperties)
+    bpy.types.Object.properties = PointerProperty(type=MyObjectProperties)
+    bpy.app.handlers.load_post.append(load_file)
+
+
+def unregister():
+    from bpy.utils import unregister_class
+
+    mesh_pool.shutdown()
+    if track_changes in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(track_changes)
+    if load_file in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(load_file)
+
+    for cls in reversed(classes):
+        unregister_class(cls)
+    del bpy.types.Scene.my_tool
+    del bpy.types.Object.properties
+
+
+def main(argv=None):
+    """Export from the command line, without the panel.
+
+    blender -b robot.blend --factory-startup --python-expr
+        "import blender_to_mujoco; blender_to_mujoco.main()" -- --output DIR
+
+    argv defaults to the arguments after "--". The add-on is registered
+    first if it is not enabled. Settings start from their defaults, so
+    the panel state saved in the .blend file does not change the export.
+    """
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    if not hasattr(bpy.types.Scene, "my_tool"):
+        register()
+
+    parser = argparse.ArgumentParser(prog="blender_to_mujoco")
+    parser.add_argument("--output", required=True, help="output directory")
+    parser.add_argument(
+        "--options", default="{}", help="JSON object of export settings (my_tool)"
+    )
+    parser.add_argument("--result", help="write a JSON summary of the export here")
+    args = parser.parse_args(argv)
+
+    mytool = scene.my_tool
+    # start from the defaults, not the panel state saved in the .blend file
+    for prop in mytool.bl_rna.properties:
+        if prop.identifier != "rna_type":
+            mytool.property_unset(prop.identifier)
+    for key, value in json.loads(args.options).items():
+        setattr(mytool, key, value)
+
+    output = os.path.join(os.path.abspath(args.output), "")
+    os.makedirs(output, exist_ok=True)
+
+    start = time.perf_counter()
+    summary = export_scene(output)
+    summary["blend_file"] = bpy.data.filepath
+    summary["seconds"] = time.perf_counter() - start
+
+    if args.result:
+        with open(args.result, "w") as f:
+            json.dump(summary, f, indent=1)
+    print(json.dumps(summary))
@@ -0,0 +1,72 @@
+"""Texture pixels encoded as PNG, run in worker threads.
+
+Nothing here imports bpy; the exporter reads the image pixels.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+
+def downscale(pixels, max_size):
+    """Shrink an (H, W, C) image so its longest side is at most max_size.
+
+    Every output pixel is the mean of the input pixels it covers.
+    """
+    height, width = pixels.shape[:2]
+    if max_size <= 0 or max(height, width) <= max_size:
+        return pixels
+
+    scale = max_size / max(height, width)
+    out_height = max(1, round(height * scale))
+    out_width = max(1, round(width * scale))
+    rows = np.arange(out_height) * height // out_height
+    cols = np.arange(out_width) * width // out_width
+    summed = np.add.reduceat(np.add.reduceat(pixels, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, height)), np.diff(np.append(cols, width)))
+    return summed / counts[..., np.newaxis]
+
+
+def linear_to_srgb(pixels):
+    """Encode linear color channels with the sRGB transfer curve.
+
+    The alpha channel is left linear.
+    """
+    channels = 3 if pixels.shape[2] >= 3 else 1
+    color = np.clip(pixels[..., :channels], 0.0, 1.0)
+    color = np.where(
+        color <= 0.0031308, color * 12.92, 1.055 * color ** (1 / 2.4) - 0.055
+    )
+    return np.concatenate((color, pixels[..., channels:]), axis=2)
+
+
+def png_chunk(kind, data):
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def write_png(file_path, pixels, level):
+    """Write an (H, W, C) uint8 image, stored bottom row first, as PNG.
+
+    Rows use the PNG Up filter, which compresses photographic
+    textures much better than unfiltered rows.
+    """
+    height, width, channels = pixels.shape
+    rows = pixels[::-1].reshape(height, width * channels)
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]
+
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    with open(file_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", header))
+        f.write(png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), level)))
+        f.write(png_chunk(b"IEND", b""))
@@ -0,0 +1,173 @@
+"""Mesh file encoders, run in worker processes, and decoders.
+
+Nothing here imports bpy, so the process pool of the exporter can import
+this module in a plain Python interpreter. The OBJ writer formats text,
+which holds the GIL, so mesh files are encoded in processes rather than
+threads. The importer reads mesh assets with the decoders.
+"""
+
+import numpy as np
+
+
+class MeshData:
+    """Triangulated mesh buffers read from an evaluated mesh"""
+
+    def __init__(self, name, vertices, triangles, loops, normals, uvs):
+        self.name = name
+        self.vertices = vertices
+        self.triangles = triangles
+        self.loops = loops
+        self.normals = normals
+        self.uvs = uvs
+
+
+def format_rows(fmt, array):
+    """Format every row of a 2D array with one string operation."""
+    if len(array) == 0:
+        return ""
+    return (fmt * len(array)) % tuple(array.ravel().tolist())
+
+
+def write_obj(file_path, data):
+    """Write triangulated mesh data to an OBJ file."""
+    faces = data.triangles + 1
+    loops = data.loops + 1
+
+    with open(file_path, "w") as f:
+        f.write("# Mujoco Exporter\n")
+        f.write(format_rows("v %.6f %.6f %.6f\n", data.vertices))
+
+        if data.uvs is not None:
+            f.write(format_rows("vt %.6f %.6f\n", data.uvs))
+            f.write(format_rows("vn %.4f %.4f %.4f\n", data.normals))
+            corners = np.stack((faces, loops, loops), axis=2)
+            f.write(format_rows("f %d/%d/%d %d/%d/%d %d/%d/%d\n", corners))
+        else:
+            f.write(format_rows("vn %.4f %.4f %.4f\n", data.normals))
+            corners = np.stack((faces, loops), axis=2)
+            f.write(format_rows("f %d//%d %d//%d %d//%d\n", corners))
+
+
+def face_normals(vertices, triangles):
+    """Unit normal of every triangle."""
+    corners = vertices[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(length == 0, 1, length)
+
+
+def write_stl(file_path, data):
+    """Write triangulated mesh data to a binary STL file."""
+    facets = np.zeros(
+        len(data.triangles),
+        dtype=[("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attr", "<u2")],
+    )
+    facets["normal"] = face_normals(data.vertices, data.triangles)
+    facets["vertices"] = data.vertices[data.triangles]
+
+    with open(file_path, "wb") as f:
+        f.write(b"Mujoco Exporter".ljust(80, b" "))
+        f.write(np.uint32(len(facets)).tobytes())
+        f.write(facets.tobytes())
+
+
+def write_msh(file_path, data):
+    """Write triangulated mesh data to a MuJoCo binary .msh file.
+
+    MSH stores normals and texture coordinates per vertex, so vertices
+    are split wherever their loops disagree.
+    """
+    columns = [data.triangles.reshape(-1, 1), data.normals[data.loops.ravel()]]
+    if data.uvs is not None:
+        columns.append(data.uvs[data.loops.ravel()])
+    corners = np.hstack(columns).astype(np.float64)
+    unique, index = np.unique(corners, axis=0, return_inverse=True)
+
+    vertices = data.vertices[unique[:, 0].astype(np.int64)].astype("<f4")
+    normals = unique[:, 1:4].astype("<f4")
+    uvs = unique[:, 4:6].astype("<f4") if data.uvs is not None else None
+    faces = index.reshape(-1, 3).astype("<i4")
+
+    header = np.array(
+        [len(vertices), len(normals), 0 if uvs is None else len(uvs), len(faces)],
+        dtype="<i4",
+    )
+    with open(file_path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(vertices.tobytes())
+        f.write(normals.tobytes())
+        if uvs is not None:
+            f.write(uvs.tobytes())
+        f.write(faces.tobytes())
+
+
+MESH_FORMATS = {
+    "OBJ": (".obj", write_obj),
+    "STL": (".stl", write_stl),
+    "MSH": (".msh", write_msh),
+}
+
+
+def write_mesh_file(mesh_format, file_path, data):
+    """Encode data and write it to file_path in the given format."""
+    MESH_FORMATS[mesh_format][1](file_path, data)
+    return file_path
+
+
+def read_obj(file_path):
+    """Vertices and triangles of an OBJ file. Polygons are split into fans."""
+    positions = []
+    faces = []
+    with open(file_path) as f:
+        for line in f:
+            if line.startswith("v "):
+                positions.append(line.split()[1:4])
+            elif line.startswith("f "):
+                corners = [int(c.split("/")[0]) for c in line.split()[1:]]
+                # negative indices count back from the last vertex read
+                corners = [c - 1 if c > 0 else len(positions) + c for c in corners]
+                for i in range(1, len(corners) - 1):
+                    faces.append((corners[0], corners[i], corners[i + 1]))
+    return (
+        np.array(positions, dtype=np.float32).reshape(-1, 3),
+        np.array(faces, dtype=np.int32).reshape(-1, 3),
+    )
+
+
+def read_stl(file_path):
+    """Vertices and triangles of a binary or ASCII STL file.
+
+    STL stores every triangle corner, so equal corners are merged.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    facets = int.from_bytes(data[80:84], "little") if len(data) >= 84 else -1
+    if len(data) == 84 + 50 * facets:
+        records = np.frombuffer(
+            data,
+            dtype=[("normal", "<f4", 3), ("corners", "<f4", (3, 3)), ("attr", "<u2")],
+            count=facets,
+            offset=84,
+        )
+        corners = records["corners"].reshape(-1, 3)
+    else:
+        corners = np.array(
+            [
+                line.split()[1:4]
+                for line in data.decode().splitlines()
+                if line.strip().startswith("vertex")
+            ],
+            dtype=np.float32,
+        )
+    vertices, triangles = np.unique(corners.reshape(-1, 3), axis=0, return_inverse=True)
+    return vertices, triangles.astype(np.int32).reshape(-1, 3)
+
+
+def read_msh(file_path):
+    """Vertices and triangles of a MuJoCo binary .msh file."""
+    header = np.fromfile(file_path, dtype="<i4", count=4)
+    vertex_count, normal_count, uv_count, face_count = header.tolist()
+    offset = 16 + 4 * (3 * vertex_count + 3 * normal_count + 2 * uv_count)
+    vertices = np.fromfile(file_path, dtype="<f4", count=3 * vertex_count, offset=16)
+    faces = np.fromfile(file_path, dtype="<i4", count=3 * face_count, offset=offset)
+    return vertices.reshape(-1, 3), faces.reshape(-1, 3)
@@ -0,0 +1,546 @@
+"""Plain Python model of a MuJoCo XML file, and the emitter that writes it.
+
+Nothing here imports bpy. The add-on fills a Model from the Blender scene
+and emit_model turns it into an lxml tree, so emission can be run,
+profiled and tested without starting Blender.
+
+Positions, rotations, sizes and ranges are kept as numbers. Before a
+model is emitted, format_model turns them into attribute strings, a batch
+of equal-length vectors at a time, and the emitters look them up in the
+returned FieldStrings. The model itself is not changed.
+"""
+
+import numpy as np
+from lxml import etree as ET
+
+
+def format_vectors(vectors, precision=4):
+    """Format a list of equal-length vectors as attribute strings.
+
+    Values are rounded to precision decimals, -0 is written as 0 and whole
+    numbers without a decimal point. Values too large to be held exactly
+    as integers stay floats. A vector of three zeros gives None.
+    """
+    if not len(vectors):
+        return []
+
+    array = np.round(np.asarray(vectors, dtype=np.float64), precision)
+    array = array.reshape(len(vectors), -1) + 0.0  # -0.0 + 0.0 is 0.0
+    whole = (np.abs(array) < 2**53) & (array == np.trunc(array))
+    values = array.astype(object)
+    values[whole] = array[whole].astype(np.int64).astype(object)
+
+    # one % operation formats the whole batch
+    width = array.shape[1]
+    row_format = " ".join(["%s"] * width) + "\n"
+    text = (row_format * len(array)) % tuple(values.ravel().tolist())
+
+    strings = text.split("\n")[:-1]
+    if array.shape[1] == 3:
+        for row in np.flatnonzero(~array.any(axis=1)):
+            strings[row] = None
+    return strings
+
+
+def vector_to_string(values, precision=4):
+    """Format one vector, see format_vectors. Strings are passed through."""
+    if values is None or isinstance(values, str):
+        return values
+    return format_vectors([values], precision)[0]
+
+
+def element_attributes(**kwargs):
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+class Joint:
+    """A hinge, slide or ball joint; range is in radians or units."""
+
+    __slots__ = ("name", "axis", "type", "range")
+
+    def __init__(self, name, axis, type="HINGE", range=None):
+        self.name = name
+        self.axis = axis
+        self.type = type
+        self.range = range
+
+
+class Geom:
+    __slots__ = ("type", "mesh", "euler", "pos", "size", "class_name", "material")
+
+    def __init__(
+        self,
+        type=None,
+        mesh=None,
+        euler=None,
+        pos=None,
+        size=None,
+        class_name=None,
+        material=None,
+    ):
+        self.type = type
+        self.mesh = mesh
+        self.euler = euler
+        self.pos = pos
+        self.size = size
+        self.class_name = class_name
+        self.material = material
+
+
+class Site:
+    __slots__ = ("name", "pos", "size", "material")
+
+    def __init__(self, name, pos=None, size=None, material=None):
+        self.name = name
+        self.pos = pos
+        self.size = size
+        self.material = material
+
+
+class Body:
+    __slots__ = ("name", "pos", "euler", "joint", "geoms", "sites", "bodies")
+
+    def __init__(self, name, pos=None, euler=None, joint=None):
+        self.name = name
+        self.pos = pos
+        self.euler = euler
+        self.joint = joint
+        self.geoms = []
+        self.sites = []
+        self.bodies = []
+
+
+class Material:
+    __slots__ = ("name", "shininess", "rgba", "texture")
+
+    def __init__(self, name, shininess, rgba, texture=None):
+        self.name = name
+        self.shininess = shininess
+        self.rgba = rgba
+        self.texture = texture
+
+
+class Texture:
+    __slots__ = ("name", "file")
+
+    def __init__(self, name, file):
+        self.name = name
+        self.file = file
+
+
+class MeshAsset:
+    __slots__ = ("name", "file", "scale")
+
+    def __init__(self, name, file, scale=None):
+        self.name = name
+        self.file = file
+        self.scale = scale
+
+
+class Actuator:
+    __slots__ = ("name", "joint", "ctrlrange")
+
+    def __init__(self, name, joint, ctrlrange=None):
+        self.name = name
+        self.joint = joint
+        self.ctrlrange = ctrlrange
+
+
+class Light:
+    __slots__ = (
+        "directional",
+        "attenuation",
+        "diffuse",
+        "pos",
+        "dir",
+        "mode",
+        "target",
+    )
+
+    def __init__(
+        self, directional, pos, dir, diffuse, attenuation=None, mode=None, target=None
+    ):
+        self.directional = directional
+        self.attenuation = attenuation
+        self.diffuse = diffuse
+        self.pos = pos
+        self.dir = dir
+        self.mode = mode
+        self.target = target
+
+
+class Camera:
+    __slots__ = ("name", "pos", "target")
+
+    def __init__(self, name, pos, target):
+        self.name = name
+        self.pos = pos
+        self.target = target
+
+
+class Model:
+    """One MuJoCo XML file: assets, defaults, actuators and a root body.
+
+    class_name is the default class every body of the model uses.
+    """
+
+    __slots__ = (
+        "name",
+        "class_name",
+        "materials",
+        "textures",
+        "meshes",
+        "actuators",
+        "lights",
+        "cameras",
+        "body",
+    )
+
+    def __init__(self, name, class_name, body=None):
+        self.name = name
+        self.class_name = class_name
+        self.materials = []
+        self.textures = []
+        self.meshes = []
+        self.actuators = []
+        self.lights = []
+        self.cameras = []
+        self.body = body
+
+
+# lights of a model whose root is not a light
+DEFAULT_LIGHTS = (
+    Light("true", (2, -2, 4), (-0.5, 0.5, -1), (0.7, 0.7, 0.65), (0.01, 0.01, 0.01)),
+    Light("false", (-6, -6, 5), (-0.5, 0.5, -1), (0.3, 0.3, 0.3), (0.15, 0.15, 0.15)),
+    Light("false", (-6, -6, 5), (-0.5, 0.5, -1), (0.3, 0.3, 0.3), (0.15, 0.15, 0.15)),
+    Light("false", (6, 6, 5), (-0.5, 0.5, -1), (0.3, 0.3, 0.3), (0.15, 0.15, 0.15)),
+)
+
+
+# numeric fields of each class, formatted by format_fields
+NUMERIC_FIELDS = {
+    Body: ("pos", "euler"),
+    Joint: ("axis", "range"),
+    Geom: ("euler", "pos", "size"),
+    Site: ("pos", "size"),
+    Material: ("rgba",),
+    MeshAsset: ("scale",),
+    Actuator: ("ctrlrange",),
+    Light: ("attenuation", "diffuse", "pos", "dir"),
+    Camera: ("pos",),
+}
+
+
+class FieldStrings:
+    """Attribute strings of the numeric fields of model items.
+
+    Strings are keyed by item and field. Fields of items that were not
+    added are formatted one at a time when they are looked up.
+    """
+
+    def __init__(self, precision=4):
+        self.precision = precision
+        self.strings = {}
+
+    def add(self, items):
+        """Format the numeric fields of items, equal-length vectors together."""
+        groups = {}
+        for item in items:
+            for field in NUMERIC_FIELDS[type(item)]:
+                values = getattr(item, field)
+                if values is not None and not isinstance(values, str):
+                    groups.setdefault(len(values), []).append((item, field, values))
+
+        for group in groups.values():
+            strings = format_vectors([values for _, _, values in group], self.precision)
+            for (item, field, _), string in zip(group, strings):
+                self.strings[id(item), field] = string
+        return self
+
+    def get(self, item, field):
+        try:
+            return self.strings[id(item), field]
+        except KeyError:
+            return vector_to_string(getattr(item, field), self.precision)
+
+
+def format_fields(items, precision=4):
+    """FieldStrings of items; None and string fields are passed through."""
+    return FieldStrings(precision).add(items)
+
+
+def body_items(body, recurse=True):
+    """The body, its joint, geoms and sites and, with recurse, those of its children."""
+    items = []
+    bodies = [body]
+    while bodies:
+        body = bodies.pop()
+        items.append(body)
+        if body.joint is not None:
+            items.append(body.joint)
+        items.extend(body.geoms)
+        items.extend(body.sites)
+        if recurse:
+            bodies.extend(body.bodies)
+    return items
+
+
+def format_body(body, precision=4, recurse=True):
+    return format_fields(body_items(body, recurse), precision)
+
+
+def format_model(model, precision=4):
+    items = model.materials + model.meshes + model.actuators
+    items += model.lights + model.cameras
+    if model.body is not None:
+        items += body_items(model.body)
+    return format_fields(items, precision)
+
+
+def emit_joint(body_element, joint, text=None):
+    if text is None:
+        text = FieldStrings()
+    element = ET.SubElement(
+        body_element,
+        "joint",
+        attrib=element_attributes(
+            name=joint.name, axis=text.get(joint, "axis"), limited="true"
+        ),
+    )
+    if joint.type == "SLIDE":
+        element.set("type", "slide")
+    joint_range = text.get(joint, "range")
+    if joint_range is not None:
+        element.set("range", joint_range)
+    return element
+
+
+def emit_geom(body_element, geom, text=None):
+    if text is None:
+        text = FieldStrings()
+    return ET.SubElement(
+        body_element,
+        "geom",
+        attrib=element_attributes(
+            type=geom.type,
+            mesh=geom.mesh,
+            euler=text.get(geom, "euler"),
+            pos=text.get(geom, "pos"),
+            size=text.get(geom, "size"),
+            **{"class": geom.class_name},
+            material=geom.material,
+        ),
+    )
+
+
+def emit_site(body_element, site, text=None):
+    if text is None:
+        text = FieldStrings()
+    return ET.SubElement(
+        body_element,
+        "site",
+        attrib=element_attributes(
+            name=site.name,
+            rgba="1 0 0 1",
+            pos=text.get(site, "pos"),
+            type="sphere",
+            size=text.get(site, "size"),
+            group="3",
+            material=site.material,
+        ),
+    )
+
+
+def emit_body(parent_element, body, recurse=True, elements=None, text=None):
+    """Write a body with its joint, geoms and sites.
+
+    With recurse, child bodies are written inside it, walking the tree
+    with an explicit stack so deep chains do not hit the recursion limit.
+    elements, when given, maps the name of every written body to its
+    element. text holds the formatted fields; without it the body is
+    formatted here. Returns the element of body.
+    """
+    if text is None:
+        text = format_body(body, recurse=recurse)
+    root = None
+    stack = [(parent_element, body)]
+    while stack:
+        parent_element, body = stack.pop()
+        element = ET.SubElement(
+            parent_element,
+            "body",
+            attrib=element_attributes(
+                name=body.name,
+                pos=text.get(body, "pos"),
+                euler=text.get(body, "euler"),
+            ),
+        )
+        if body.joint is not None:
+            emit_joint(element, body.joint, text)
+        for geom in body.geoms:
+            emit_geom(element, geom, text)
+        for site in body.sites:
+            emit_site(element, site, text)
+
+        if elements is not None:
+            elements[body.name] = element
+        if root is None:
+            root = element
+
+        if recurse:
+            # reversed, so children are popped and appended in order
+            stack.extend((element, child) for child in reversed(body.bodies))
+    return root
+
+
+def emit_actuator(actuators_element, actuator, text=None):
+    if text is None:
+        text = FieldStrings()
+    return ET.SubElement(
+        actuators_element,
+        "position",
+        attrib=element_attributes(
+            name=actuator.name,
+            kp="2",
+            joint=actuator.joint,
+            ctrlrange=text.get(actuator, "ctrlrange"),
+            ctrllimited="true",
+        ),
+    )
+
+
+def emit_assets(asset, model, text):
+    ET.SubElement(asset, "material", name="collision", rgba="0.3 0.3 1 0.5")
+    for material in model.materials:
+        ET.SubElement(
+            asset,
+            "material",
+            attrib=element_attributes(
+                name=material.name,
+                shininess=str(material.shininess),
+                rgba=text.get(material, "rgba"),
+                texture=material.texture,
+            ),
+        )
+    for texture in model.textures:
+        ET.SubElement(asset, "texture", name=texture.name, type="2d", file=texture.file)
+
+
+def emit_defaults(root, class_name):
+    default = ET.SubElement(root, "default")
+    default_class = ET.SubElement(default, "default", attrib={"class": class_name})
+    ET.SubElement(default_class, "joint", attrib={"limited": "true", "damping": "1"})
+    ET.SubElement(
+        default_class,
+        "geom",
+        attrib={"contype": "0", "conaffinity": "0", "group": "1", "type": "mesh"},
+    )
+    ET.SubElement(default_class, "position", attrib={"ctrllimited": "true"})
+    collision = ET.SubElement(default_class, "default", attrib={"class": "collision"})
+    ET.SubElement(
+        collision,
+        "geom",
+        attrib={
+            "contype": "1",
+            "conaffinity": "1",
+            "condim": "4",
+            "group": "4",
+            "material": "collision",
+        },
+    )
+
+
+def emit_header(root, model, with_actuators=True, text=None):
+    """Write everything of the model but the worldbody into root."""
+    if text is None:
+        text = format_model(model)
+    ET.SubElement(
+        root,
+        "compiler",
+        inertiafromgeom="auto",
+        inertiagrouprange="4 4",
+        angle="radian",
+    )
+    ET.SubElement(root, "size", njmax="1000", nconmax="500")
+    asset = ET.SubElement(root, "asset")
+    emit_assets(asset, model, text)
+
+    visual = ET.SubElement(root, "visual")
+    ET.SubElement(visual, "map", fogstart="1.5", fogend="5", force="0.1", znear="0.1")
+    ET.SubElement(visual, "quality", shadowsize="16384", offsamples="24")
+    ET.SubElement(visual, "global", offwidth="800", offheight="800")
+
+    emit_defaults(root, model.class_name)
+
+    if with_actuators:
+        actuators = ET.SubElement(root, "actuator")
+
+    for mesh in model.meshes:
+        ET.SubElement(
+            asset,
+            "mesh",
+            attrib=element_attributes(
+                name=mesh.name, file=mesh.file, scale=text.get(mesh, "scale")
+            ),
+        )
+
+    if with_actuators:
+        for actuator in model.actuators:
+            emit_actuator(actuators, actuator, text)
+
+
+def emit_lights(worldbody, model, text=None):
+    if text is None:
+        text = format_model(model)
+    for light in model.lights:
+        ET.SubElement(
+            worldbody,
+            "light",
+            attrib=element_attributes(
+                mode=light.mode,
+                target=light.target,
+                directional=light.directional,
+                attenuation=text.get(light, "attenuation"),
+                diffuse=text.get(light, "diffuse"),
+                specular="0.3 0.3 0.3",
+                pos=text.get(light, "pos"),
+                dir=text.get(light, "dir"),
+            ),
+        )
+    for camera in model.cameras:
+        ET.SubElement(
+            worldbody,
+            "camera",
+            attrib=element_attributes(
+                name=camera.name,
+                pos=text.get(camera, "pos"),
+                mode="targetbodycom",
+                target=camera.target,
+            ),
+        )
+
+
+def emit_worldbody(root, model, elements=None, text=None):
+    if text is None:
+        text = format_model(model)
+    worldbody = ET.SubElement(root, "worldbody")
+    main_body = ET.SubElement(
+        worldbody, "body", attrib={"childclass": model.class_name}
+    )
+    emit_lights(worldbody, model, text)
+    if model.body is not None:
+        emit_body(main_body, model.body, elements=elements, text=text)
+    return worldbody
+
+
+def emit_model(model, precision=4):
+    """Return the <mujoco> element of a complete model."""
+    text = format_model(model, precision)
+    root = ET.Element("mujoco", model=model.name)
+    emit_header(root, model, text=text)
+    emit_worldbody(root, model, text=text)
+    return root
+
+
+def write_model(model, path, precision=4):
+    ET.ElementTree(emit_model(model, precision)).write(str(path), pretty_print=True)
@@ -0,0 +1,403 @@
+"""MuJoCo XML read back for the importer: includes, default classes, frames
+and the body tree.
+
+Nothing here imports bpy or mathutils, so the parts of the import that
+interpret the model run and are tested in plain Python. Quaternions are
+NumPy arrays in MuJoCo's w x y z order.
+"""
+
+import copy
+from pathlib import Path
+
+import numpy as np
+from lxml import etree
+
+# Queries run on every model, compiled once
+INCLUDES = etree.XPath("//include[@file]")
+COMPILERS = etree.XPath("./compiler")
+DEFAULTS = etree.XPath("./default")
+WORLDBODIES = etree.XPath("./worldbody")
+MESH_ASSETS = etree.XPath("./asset/mesh[@file]")
+TEXTURE_ASSETS = etree.XPath("./asset/texture[@file]")
+
+# Orientation attributes other than quat, see resolve_frame
+ORIENTATIONS = ("axisangle", "euler", "xyaxes", "zaxis")
+AXES = {"x": (1, 0, 0), "y": (0, 1, 0), "z": (0, 0, 1)}
+
+
+def expand_includes(file_path, folder, parse, files=None, chain=()):
+    """Root of file_path with every <include> replaced by the children of
+    the root of the included file, at any depth, as MuJoCo compiles it.
+
+    parse(path) returns the parsed tree of a file, or None if it cannot
+    be read; parsed trees are copied before they are changed. Include
+    paths are relative to folder, the main model folder. Every file read
+    is appended to files. Include cycles and files included twice are
+    reported and left out. Returns None if file_path cannot be read.
+    """
+    if files is None:
+        files = []
+    file_path = Path(file_path).resolve()
+    if file_path in chain:
+        names = " -> ".join(p.name for p in chain + (file_path,))
+        print("Error: include cycle {}".format(names))
+        return None
+    if file_path in files:
+        print("Error: {} is included more than once".format(file_path))
+        return None
+    files.append(file_path)
+
+    tree = parse(file_path)
+    if tree is None:
+        return None
+    root = tree.getroot()
+    includes = INCLUDES(root)
+    # included roots give away their children, so they are copied too
+    if chain or includes:
+        root = copy.deepcopy(root)
+        includes = INCLUDES(root)
+    for include in includes:
+        included = expand_includes(
+            Path(folder) / include.get("file"),
+            folder,
+            parse,
+            files,
+            chain + (file_path,),
+        )
+        parent = include.getparent()
+        position = parent.index(include)
+        parent[position : position + 1] = [] if included is None else list(included)
+    return root
+
+
+class DefaultClasses:
+    """Attributes set by every <default> class, compiled once.
+
+    Each class holds {tag: attributes} with its parent classes already
+    merged in, so resolving an element is one lookup and one dict update.
+    """
+
+    def __init__(self, root):
+        self.classes = {}
+        # element -> class its children get from the nearest childclass
+        self.childclass = {}
+        for default in DEFAULTS(root):
+            self.add(default, {})
+
+    def add(self, default, inherited):
+        name = default.get("class", "main")
+        tags = self.classes.setdefault(
+            name, {tag: dict(attrs) for tag, attrs in inherited.items()}
+        )
+        nested = []
+        for child in default:
+            if child.tag == "default":
+                nested.append(child)
+            elif isinstance(child.tag, str):
+                tags.setdefault(child.tag, {}).update(child.attrib)
+        # nested classes inherit this class whatever the order in the file
+        for child in nested:
+            self.add(child, tags)
+
+    def inherited(self, element):
+        """Class given to the children of element by childclass."""
+        chain = []
+        while element is not None and element not in self.childclass:
+            chain.append(element)
+            element = element.getparent()
+        name = self.childclass[element] if element is not None else "main"
+        for link in reversed(chain):
+            name = link.get("childclass", name)
+            self.childclass[link] = name
+        return name
+
+    def resolve(self, element):
+        """Effective attributes of element: class defaults, then its own."""
+        name = element.get("class") or self.inherited(element.getparent())
+        attrs = dict(self.classes.get(name, {}).get(element.tag, {}))
+        attrs.update(element.attrib)
+        attrs.pop("class", None)
+        return attrs
+
+
+def floats(text):
+    return [float(x) for x in text.split()]
+
+
+def vector_text(values):
+    return " ".join(repr(float(v)) for v in values)
+
+
+def compiler_settings(root):
+    """Angle unit and euler sequence of <compiler>, with MuJoCo's defaults."""
+    settings = {"angle": "degree", "eulerseq": "xyz"}
+    for compiler in COMPILERS(root):
+        for key in settings:
+            settings[key] = compiler.get(key, settings[key])
+    return settings
+
+
+def quat_multiply(a, b):
+    """Hamilton product a b: rotation b followed by rotation a."""
+    w1, x1, y1, z1 = a
+    w2, x2, y2, z2 = b
+    return np.array(
+        [
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        ]
+    )
+
+
+def axis_angle_quat(axis, angle):
+    """Quaternion of a rotation by angle radians around axis."""
+    axis = np.asarray(axis, dtype=np.float64)
+    length = np.linalg.norm(axis)
+    if length == 0:
+        return np.array([1.0, 0.0, 0.0, 0.0])
+    return np.concatenate([[np.cos(angle / 2)], np.sin(angle / 2) * axis / length])
+
+
+def matrix_quat(matrix):
+    """Quaternion of a rotation matrix, with a non-negative w."""
+    m = np.asarray(matrix, dtype=np.float64)
+    trace = np.trace(m)
+    if trace > 0:
+        s = 2 * np.sqrt(trace + 1)
+        quat = [
+            s / 4,
+            (m[2, 1] - m[1, 2]) / s,
+            (m[0, 2] - m[2, 0]) / s,
+            (m[1, 0] - m[0, 1]) / s,
+        ]
+    else:
+        # largest diagonal entry, so s stays away from zero
+        i = int(np.argmax(np.diag(m)))
+        j, k = (i + 1) % 3, (i + 2) % 3
+        s = 2 * np.sqrt(1 + m[i, i] - m[j, j] - m[k, k])
+        quat = [0.0] * 4
+        quat[0] = (m[k, j] - m[j, k]) / s
+        quat[1 + i] = s / 4
+        quat[1 + j] = (m[j, i] + m[i, j]) / s
+        quat[1 + k] = (m[k, i] + m[i, k]) / s
+    quat = np.array(quat)
+    return -quat if quat[0] < 0 else quat
+
+
+def z_to_vector_quat(direction):
+    """Shortest rotation taking the z axis to direction.
+
+    The opposite direction is a half turn around x, as in MuJoCo.
+    """
+    direction = np.asarray(direction, dtype=np.float64)
+    length = np.linalg.norm(direction)
+    if length == 0:
+        return np.array([1.0, 0.0, 0.0, 0.0])
+    direction = direction / length
+    axis = np.array([-direction[1], direction[0], 0.0])
+    sin = np.linalg.norm(axis)
+    if sin < 1e-12:
+        if direction[2] > 0:
+            return np.array([1.0, 0.0, 0.0, 0.0])
+        return np.array([0.0, 1.0, 0.0, 0.0])
+    return axis_angle_quat(axis, np.arctan2(sin, direction[2]))
+
+
+def orientation(attrib, compiler):
+    """Quaternion of axisangle, euler, xyaxes or zaxis, or None."""
+    unit = np.pi / 180 if compiler["angle"] == "degree" else 1.0
+    if attrib.get("axisangle"):
+        values = floats(attrib["axisangle"])
+        return axis_angle_quat(values[:3], values[3] * unit)
+    if attrib.get("euler"):
+        # lower case axes rotate with the frame, upper case ones are fixed
+        quat = np.array([1.0, 0.0, 0.0, 0.0])
+        for axis, angle in zip(compiler["eulerseq"], floats(attrib["euler"])):
+            rotation = axis_angle_quat(AXES[axis.lower()], angle * unit)
+            if axis.islower():
+                quat = quat_multiply(quat, rotation)
+            else:
+                quat = quat_multiply(rotation, quat)
+        return quat
+    if attrib.get("xyaxes"):
+        values = np.array(floats(attrib["xyaxes"]))
+        x = values[:3] / np.linalg.norm(values[:3])
+        y = values[3:6] - x * x.dot(values[3:6])
+        y = y / np.linalg.norm(y)
+        return matrix_quat(np.column_stack([x, y, np.cross(x, y)]))
+    if attrib.get("zaxis"):
+        return z_to_vector_quat(floats(attrib["zaxis"]))
+    return None
+
+
+def resolve_fromto(attrib):
+    """Replaces the fromto of a geom by its pos, quat and full size.
+
+    The geom sits halfway between the two points with its z axis along the
+    segment, and the half-length of the segment is its last size value.
+    """
+    values = np.array(floats(attrib.pop("fromto")))
+    start, end = values[:3], values[3:6]
+    size = floats(attrib.get("size", "0"))
+    half_length = np.linalg.norm(end - start) / 2
+    if attrib.get("type") in ("box", "ellipsoid"):
+        size = (size + [0, 0])[:2] + [half_length]
+    else:
+        size = size[:1] + [half_length]
+    attrib["size"] = vector_text(size)
+    attrib["pos"] = vector_text((start + end) / 2)
+    if half_length > 0:
+        attrib["quat"] = vector_text(z_to_vector_quat(end - start))
+    return attrib
+
+
+def resolve_frame(attrib, compiler):
+    """Rewrites the orientation of a body, geom or site as quat.
+
+    Geoms and sites given by fromto get their pos, quat and size from it.
+    Objects are then placed from pos and quat alone.
+    """
+    if attrib.get("fromto"):
+        resolve_fromto(attrib)
+    elif not attrib.get("quat"):
+        quat = orientation(attrib, compiler)
+        if quat is not None:
+            attrib["quat"] = vector_text(quat)
+    for key in ORIENTATIONS:
+        attrib.pop(key, None)
+    return attrib
+
+
+class BodyNode:
+    """A body with its parent, child bodies and the resolved attributes of
+    its geoms, joints and sites"""
+
+    def __init__(self, name, attrib, parent):
+        self.name = name
+        self.attrib = attrib
+        self.parent = parent
+        self.children = []
+        self.geoms = []
+        self.joints = []
+        self.sites = []
+        # ids of the subtree content, without and with the body pose
+        self.key = None
+        self.placed_key = None
+
+    @property
+    def label(self):
+        """Name of the Blender object; unnamed bodies are called "body"."""
+        return self.name or "body"
+
+
+class BodyIndex:
+    """Every body of the model by name, built in one pass over the worldbodies.
+
+    All worldbodies of the model, included ones too, form one "world" node,
+    as in MuJoCo. Unnamed bodies have no name and are only in order, so no
+    made-up name can shadow a real one. Nodes hold plain dicts, so the index can be
+    cached without the XML.
+    """
+
+    def __init__(self):
+        self.world = BodyNode("world", {}, None)
+        self.bodies = {"world": self.world}
+        # bodies in document order, parents before their children
+        self.order = []
+
+    def build(self, root, defaults, compiler):
+        for worldbody in WORLDBODIES(root):
+            self.walk(worldbody, self.world, defaults, compiler)
+        self.set_keys()
+
+    def walk(self, element, node, defaults, compiler):
+        stack = [(element, node)]
+        while stack:
+            element, node = stack.pop()
+            if element.tag == "body":
+                self.order.append(node)
+            children = []
+            for child in element:
+                if child.tag == "geom":
+                    node.geoms.append(resolve_frame(defaults.resolve(child), compiler))
+                elif child.tag in ("joint", "freejoint"):
+                    node.joints.append(defaults.resolve(child))
+                elif child.tag == "site":
+                    node.sites.append(resolve_frame(defaults.resolve(child), compiler))
+                elif child.tag == "body":
+                    name = child.get("name")
+                    body = BodyNode(
+                        name, resolve_frame(dict(child.attrib), compiler), node
+                    )
+                    if name:
+                        self.bodies[name] = body
+                    node.children.append(body)
+                    children.append((child, body))
+            stack.extend(reversed(children))
+
+    def set_keys(self):
+        """Gives equal ids to subtrees with equal content, ignoring names.
+
+        Attributes are already resolved, so classes are accounted for.
+        """
+
+        def content(attrib):
+            return tuple(sorted((k, v) for k, v in attrib.items() if k != "name"))
+
+        ids = {}
+        # children first, so their ids are known
+        for node in reversed(self.order):
+            own = tuple(
+                item for item in content(node.attrib) if item[0] not in ("pos", "quat")
+            )
+            node.key = ids.setdefault(
+                (
+                    own,
+                    tuple(map(content, node.geoms)),
+                    tuple(map(content, node.joints)),
+                    tuple(map(content, node.sites)),
+                    tuple(c.placed_key for c in node.children),
+                ),
+                len(ids),
+            )
+            node.placed_key = ids.setdefault(
+                (node.key, node.attrib.get("pos"), node.attrib.get("quat")), len(ids)
+            )
+
+    def rows(self):
+        """The index as plain lists, parents before children, for the cache."""
+        nodes = [self.world] + self.order
+        position = {id(node): i for i, node in enumerate(nodes)}
+        return [
+            [
+                node.name,
+                node.attrib,
+                position.get(id(node.parent), -1),
+                node.geoms,
+                node.joints,
+                node.sites,
+                node.key,
+                node.placed_key,
+            ]
+            for node in nodes
+        ]
+
+    @classmethod
+    def from_rows(cls, rows):
+        index = cls()
+        nodes = []
+        for name, attrib, parent, geoms, joints, sites, key, placed_key in rows:
+            if parent < 0:
+                node = index.world
+            else:
+                node = BodyNode(name, attrib, nodes[parent])
+                nodes[parent].children.append(node)
+                if name:
+                    index.bodies[name] = node
+                index.order.append(node)
+            node.geoms, node.joints, node.sites = geoms, joints, sites
+            node.key, node.placed_key = key, placed_key
+            nodes.append(node)
+        return index
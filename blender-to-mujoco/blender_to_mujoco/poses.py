@@ -0,0 +1,37 @@
+"""Object poses in MuJoCo's conventions, computed for many objects at once.
+
+Nothing here imports bpy; the exporter reads the world matrices.
+"""
+
+import numpy as np
+
+
+def euler_xyz(rotations):
+    """Euler angles of (N, 3, 3) rotations for MuJoCo's xyz sequence.
+
+    Same angles as Blender's to_euler("ZYX").
+    """
+    sin_y = np.clip(rotations[:, 0, 2], -1.0, 1.0)
+    x = np.arctan2(-rotations[:, 1, 2], rotations[:, 2, 2])
+    y = np.arcsin(sin_y)
+    z = np.arctan2(-rotations[:, 0, 1], rotations[:, 0, 0])
+
+    # gimbal lock, only x + z is defined
+    locked = np.abs(sin_y) > 1.0 - 1e-9
+    x[locked] = np.arctan2(rotations[locked, 2, 1], rotations[locked, 1, 1])
+    z[locked] = 0.0
+    return np.stack([x, y, z], axis=1)
+
+
+def local_poses(world, parent_world):
+    """Position, rotation and euler of world matrices in their parent space.
+
+    parent_world holds the world matrix of each parent, identity when
+    there is none. Scale is removed from the rotations.
+    """
+    local = np.linalg.solve(parent_world, world)
+    positions = local[:, :3, 3]
+    rotations = local[:, :3, :3]
+    lengths = np.linalg.norm(rotations, axis=1, keepdims=True)
+    rotations = rotations / np.where(lengths == 0.0, 1.0, lengths)
+    return positions, rotations, euler_xyz(rotations)
@@ -0,0 +1,101 @@
+"""Primitive geoms fitted to collision meshes.
+
+Nothing here imports bpy. The exporter computes the convex hull volume
+the fits are compared with.
+"""
+
+import numpy as np
+
+
+class PrimitiveFit:
+    """Primitive geom bounding a mesh, in the object's scaled frame"""
+
+    def __init__(self, primitive, size, center, rotation, volume):
+        self.primitive = primitive
+        self.size = size
+        self.center = center
+        self.rotation = rotation
+        self.volume = volume
+
+
+def fit_frames(points):
+    """Candidate frames for fitting: the object axes and the PCA axes."""
+    offsets = points - points.mean(axis=0)
+    axes = np.linalg.eigh(offsets.T @ offsets)[1]
+    if np.linalg.det(axes) < 0:
+        axes[:, 0] = -axes[:, 0]
+    return [np.eye(3), axes]
+
+
+def fit_primitives(points):
+    """Fit a sphere, oriented boxes, cylinders and capsules to points.
+
+    Returns every candidate; each one contains all of the points.
+    """
+    fits = []
+
+    center = (points.min(axis=0) + points.max(axis=0)) / 2
+    radius = np.linalg.norm(points - center, axis=1).max()
+    fits.append(
+        PrimitiveFit("sphere", (radius,), center, np.eye(3), 4 / 3 * np.pi * radius**3)
+    )
+
+    for frame in fit_frames(points):
+        local = points @ frame
+        low = local.min(axis=0)
+        high = local.max(axis=0)
+        half = (high - low) / 2
+        center = frame @ ((high + low) / 2)
+        local = local - (high + low) / 2
+        fits.append(PrimitiveFit("box", tuple(half), center, frame, 8 * half.prod()))
+
+        for axis in range(3):
+            # cylinder and capsule axes run along local z in MuJoCo
+            order = [(axis + 1) % 3, (axis + 2) % 3, axis]
+            rotation = frame[:, order]
+            height = np.abs(local[:, axis])
+            radial = np.linalg.norm(local[:, order[:2]], axis=1)
+            radius = radial.max()
+
+            fits.append(
+                PrimitiveFit(
+                    "cylinder",
+                    (radius, half[axis]),
+                    center,
+                    rotation,
+                    np.pi * radius**2 * 2 * half[axis],
+                )
+            )
+
+            cap = np.sqrt(np.maximum(radius**2 - radial**2, 0))
+            length = max((height - cap).max(), 0)
+            fits.append(
+                PrimitiveFit(
+                    "capsule",
+                    (radius, length),
+                    center,
+                    rotation,
+                    np.pi * radius**2 * 2 * length + 4 / 3 * np.pi * radius**3,
+                )
+            )
+
+    return fits
+
+
+def best_primitive(points, reference, tolerance):
+    """Tightest fitted primitive, if it is within tolerance of the hull.
+
+    Tightness is the primitive volume over reference, the convex hull
+    volume of the points, which every bounding primitive is at least as
+    large as.
+    """
+    if reference <= 0:
+        return None
+
+    # near ties go to the simpler primitive, e.g. sphere over a short capsule
+    fits = fit_primitives(points)
+    smallest = min(fit.volume for fit in fits)
+    best = next(fit for fit in fits if fit.volume <= smallest * 1.01)
+    if best.volume > reference * (1 + tolerance):
+        return None
+    return best
@@ -0,0 +1 @@
+# Lets pytest import the blender_to_mujoco package from this folder.
@@ -0,0 +1,66 @@
+import struct
+import zlib
+
+import numpy as np
+
+from blender_to_mujoco.image_io import downscale, linear_to_srgb, write_png
+
+
+def read_png(path):
+    """Decode an 8-bit PNG written with the Up filter, bottom row first."""
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    offset = 8
+    chunks = {}
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        kind = data[offset + 4 : offset + 8]
+        body = data[offset + 8 : offset + 8 + length]
+        (crc,) = struct.unpack(">I", data[offset + 8 + length : offset + 12 + length])
+        assert crc == zlib.crc32(kind + body)
+        chunks[kind] = chunks.get(kind, b"") + body
+        offset += 12 + length
+
+    width, height, depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert depth == 8
+    channels = {0: 1, 4: 2, 2: 3, 6: 4}[color_type]
+    rows = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8)
+    rows = rows.reshape(height, width * channels + 1)
+    assert (rows[:, 0] == 2).all()
+    pixels = np.cumsum(rows[:, 1:], axis=0, dtype=np.uint8)
+    return pixels.reshape(height, width, channels)[::-1]
+
+
+def test_write_png_decodes_to_the_same_pixels(tmp_path):
+    rng = np.random.default_rng(0)
+    for channels in (1, 2, 3, 4):
+        pixels = rng.integers(0, 256, size=(7, 5, channels), dtype=np.uint8)
+        path = tmp_path / "texture{}.png".format(channels)
+        write_png(path, pixels, level=6)
+        assert np.array_equal(read_png(path), pixels)
+
+
+def test_downscale_averages_blocks():
+    pixels = np.arange(16, dtype=np.float32).reshape(4, 4, 1)
+    small = downscale(pixels, 2)
+    assert small.shape == (2, 2, 1)
+    assert np.allclose(small[..., 0], [[2.5, 4.5], [10.5, 12.5]])
+
+
+def test_downscale_keeps_small_images():
+    pixels = np.zeros((3, 2, 4), dtype=np.float32)
+    assert downscale(pixels, 4) is pixels
+    assert downscale(pixels, 0) is pixels
+
+
+def test_linear_to_srgb_leaves_alpha_linear():
+    pixels = np.array([[[0.0, 0.18, 1.0, 0.5]]], dtype=np.float32)
+    encoded = linear_to_srgb(pixels)
+    assert np.allclose(encoded[0, 0, :3], [0.0, 0.4613, 1.0], atol=1e-4)
+    assert encoded[0, 0, 3] == 0.5
+
+
+def test_linear_to_srgb_grey_and_alpha():
+    pixels = np.array([[[2.0, 0.25]]], dtype=np.float32)
+    encoded = linear_to_srgb(pixels)
+    assert np.allclose(encoded[0, 0], [1.0, 0.25])
@@ -0,0 +1,113 @@
+import multiprocessing
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from blender_to_mujoco.mesh_io import (
+    MeshData,
+    face_normals,
+    read_msh,
+    read_obj,
+    read_stl,
+    write_mesh_file,
+)
+
+
+def tetrahedron(uvs=False):
+    vertices = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)], dtype=np.float32)
+    triangles = np.array([(0, 2, 1), (0, 1, 3), (0, 3, 2), (1, 2, 3)], dtype=np.int32)
+    loops = np.arange(12, dtype=np.int32).reshape(-1, 3)
+    normals = np.repeat(face_normals(vertices, triangles), 3, axis=0)
+    uv = np.zeros((12, 2), dtype=np.float32) if uvs else None
+    return MeshData("tetra", vertices, triangles, loops, normals, uv)
+
+
+def test_write_obj(tmp_path):
+    path = tmp_path / "tetra.obj"
+    write_mesh_file("OBJ", path, tetrahedron())
+    lines = path.read_text().splitlines()
+    assert sum(line.startswith("v ") for line in lines) == 4
+    assert sum(line.startswith("vn ") for line in lines) == 12
+    assert "f 1//1 3//2 2//3" in lines
+
+
+def test_write_obj_with_uvs(tmp_path):
+    path = tmp_path / "tetra.obj"
+    write_mesh_file("OBJ", path, tetrahedron(uvs=True))
+    lines = path.read_text().splitlines()
+    assert sum(line.startswith("vt ") for line in lines) == 12
+    assert "f 1/1/1 3/2/2 2/3/3" in lines
+
+
+def test_write_stl(tmp_path):
+    path = tmp_path / "tetra.stl"
+    write_mesh_file("STL", path, tetrahedron())
+    data = path.read_bytes()
+    assert struct.unpack("<I", data[80:84]) == (4,)
+    assert len(data) == 84 + 4 * 50
+
+
+def test_write_msh(tmp_path):
+    path = tmp_path / "tetra.msh"
+    write_mesh_file("MSH", path, tetrahedron())
+    nvertex, nnormal, ntexcoord, nface = struct.unpack("<4i", path.read_bytes()[:16])
+    # flat shaded, so every corner of a face gets its own vertex
+    assert (nvertex, nnormal, ntexcoord, nface) == (12, 12, 0, 4)
+
+
+def triangle_set(vertices, triangles):
+    """Triangles as sets of corner positions, independent of vertex order."""
+    return {
+        frozenset(map(tuple, np.round(vertices[triangle], 6))) for triangle in triangles
+    }
+
+
+def test_read_back_every_format(tmp_path):
+    data = tetrahedron(uvs=True)
+    expected = triangle_set(data.vertices, data.triangles)
+    for mesh_format, reader in (
+        ("OBJ", read_obj),
+        ("STL", read_stl),
+        ("MSH", read_msh),
+    ):
+        path = tmp_path / "tetra.{}".format(mesh_format.lower())
+        write_mesh_file(mesh_format, path, data)
+        vertices, triangles = reader(path)
+        assert triangles.dtype == np.int32 and triangles.shape == (4, 3)
+        assert triangle_set(vertices, triangles) == expected
+
+
+def test_read_obj_splits_polygons_and_negative_indices(tmp_path):
+    path = tmp_path / "quad.obj"
+    path.write_text(
+        "v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nf 1/1/1 2/2/2 3/3/3 4/4/4\nf -4 -3 -2\n"
+    )
+    vertices, triangles = read_obj(path)
+    assert vertices.shape == (4, 3)
+    assert triangles.tolist() == [[0, 1, 2], [0, 2, 3], [0, 1, 2]]
+
+
+def test_read_ascii_stl(tmp_path):
+    path = tmp_path / "triangle.stl"
+    path.write_text(
+        "solid t\nfacet normal 0 0 1\nouter loop\n"
+        "vertex 0 0 0\nvertex 1 0 0\nvertex 0 1 0\n"
+        "endloop\nendfacet\nendsolid t\n"
+    )
+    vertices, triangles = read_stl(path)
+    assert triangle_set(vertices, triangles) == {
+        frozenset([(0, 0, 0), (1, 0, 0), (0, 1, 0)])
+    }
+
+
+def test_write_in_spawned_process(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        paths = [tmp_path / "tetra.obj", tmp_path / "tetra.stl"]
+        futures = [
+            pool.submit(write_mesh_file, mesh_format, path, tetrahedron())
+            for mesh_format, path in zip(("OBJ", "STL"), paths)
+        ]
+        assert [future.result() for future in futures] == paths
+    assert all(path.is_file() for path in paths)
@@ -0,0 +1,212 @@
+import math
+
+from lxml import etree as ET
+
+from blender_to_mujoco.mjcf_model import (
+    DEFAULT_LIGHTS,
+    Actuator,
+    Body,
+    Geom,
+    Joint,
+    MeshAsset,
+    Model,
+    Site,
+    emit_body,
+    emit_model,
+    format_model,
+    format_vectors,
+    vector_to_string,
+    write_model,
+)
+
+
+def test_format_vectors_rounds_and_trims():
+    strings = format_vectors([(1.0, 0.123456, -2.5), (0.5, 1e-6, 3)], precision=4)
+    assert strings == ["1 0.1235 -2.5", "0.5 0 3"]
+
+
+def test_format_vectors_writes_negative_zero_as_zero():
+    assert format_vectors([(-0.0, -0.00001, 1.0)]) == ["0 0 1"]
+
+
+def test_format_vectors_drops_zero_triples_only():
+    assert format_vectors([(0, 0, 0), (1, 0, 0)]) == [None, "1 0 0"]
+    assert format_vectors([(0, 0)]) == ["0 0"]
+    assert format_vectors([(0, 0, 0, 1)]) == ["0 0 0 1"]
+
+
+def test_format_vectors_keeps_huge_values_as_floats():
+    assert format_vectors([(1e20, -1e20, 2.0**53)]) == [
+        "1e+20 -1e+20 9007199254740992.0"
+    ]
+    assert format_vectors([(2.0**40,)]) == ["1099511627776"]
+    assert format_vectors([(float("inf"), float("nan"))]) == ["inf nan"]
+
+
+def test_format_vectors_precision():
+    assert format_vectors([(math.pi,)], precision=2) == ["3.14"]
+    assert format_vectors([(math.pi,)], precision=6) == ["3.141593"]
+
+
+def test_format_vectors_empty():
+    assert format_vectors([]) == []
+
+
+def test_vector_to_string_passes_strings_and_none():
+    assert vector_to_string(None) is None
+    assert vector_to_string("1 2 3") == "1 2 3"
+    assert vector_to_string((0.25, 0.5)) == "0.25 0.5"
+
+
+def test_emit_body_writes_tree():
+    body = Body("base", pos=(0, 0, 1), euler=(0, 0, 0))
+    body.geoms.append(Geom("box", size=(0.1, 0.2, 0.3), class_name="collision"))
+    child = Body("arm", pos=(0.5, 0, 0), joint=Joint("arm_joint", (0, 0, 1)))
+    child.sites.append(Site("tip", pos=(0.1, 0, 0), size=(0.01,)))
+    body.bodies.append(child)
+
+    parent = ET.Element("worldbody")
+    elements = {}
+    emit_body(parent, body, elements=elements)
+
+    base = parent.find("body")
+    assert base.attrib == {"name": "base", "pos": "0 0 1"}
+    assert base.find("geom").attrib == {
+        "type": "box",
+        "size": "0.1 0.2 0.3",
+        "class": "collision",
+    }
+    arm = base.find("body")
+    assert arm.get("pos") == "0.5 0 0"
+    assert arm.find("joint").attrib == {
+        "name": "arm_joint",
+        "axis": "0 0 1",
+        "limited": "true",
+    }
+    assert arm.find("site").get("size") == "0.01"
+    assert elements == {"base": base, "arm": arm}
+
+
+def test_emit_body_without_recurse():
+    body = Body("base")
+    body.bodies.append(Body("child"))
+    parent = ET.Element("worldbody")
+    emit_body(parent, body, recurse=False)
+    assert parent.find("body").find("body") is None
+
+
+def test_emit_model():
+    body = Body("base", pos=(0, 0, 0.5))
+    body.joint = Joint("slider", (1, 0, 0), type="SLIDE", range=(-0.25, 0.25))
+    body.geoms.append(Geom(mesh="base_mesh", pos=(0.123456, 0, 0)))
+    model = Model("robot", "robot", body)
+    model.meshes.append(MeshAsset("base_mesh", "base_mesh.obj", scale=(2, 2, 2)))
+    model.actuators.append(Actuator("slider", "slider", ctrlrange=(-0.25, 0.25)))
+
+    root = emit_model(model, precision=3)
+
+    assert root.tag == "mujoco" and root.get("model") == "robot"
+    assert root.find("compiler").get("angle") == "radian"
+    mesh = root.find("asset/mesh")
+    assert mesh.attrib == {
+        "name": "base_mesh",
+        "file": "base_mesh.obj",
+        "scale": "2 2 2",
+    }
+    assert root.find("actuator/position").get("ctrlrange") == "-0.25 0.25"
+    assert root.find("default/default").get("class") == "robot"
+
+    main_body = root.find("worldbody/body")
+    assert main_body.get("childclass") == "robot"
+    base = main_body.find("body")
+    assert base.get("pos") == "0 0 0.5"
+    joint = base.find("joint")
+    assert joint.get("type") == "slide"
+    assert joint.get("range") == "-0.25 0.25"
+    assert base.find("geom").attrib == {"mesh": "base_mesh", "pos": "0.123 0 0"}
+
+
+def test_emit_model_with_precision():
+    for precision, pos in ((2, "0.33 0 0"), (5, "0.33333 0 0")):
+        model = Model("robot", "robot", Body("base", pos=(1 / 3, 0, 0)))
+        root = emit_model(model, precision)
+        assert root.find("worldbody/body/body").get("pos") == pos
+
+
+def test_format_model_keeps_numbers():
+    body = Body("base", pos=(0.123456, 0, 1))
+    body.geoms.append(Geom("sphere", size=(0.5,)))
+    model = Model("robot", "robot", body)
+    model.lights.extend(DEFAULT_LIGHTS)
+
+    text = format_model(model, precision=2)
+
+    assert text.get(body, "pos") == "0.12 0 1"
+    assert text.get(body.geoms[0], "size") == "0.5"
+    assert text.get(body, "euler") is None
+    assert body.pos == (0.123456, 0, 1)
+    assert body.geoms[0].size == (0.5,)
+    assert DEFAULT_LIGHTS[0].pos == (2, -2, 4)
+
+
+def test_emit_model_twice_gives_same_xml():
+    model = Model("robot", "robot", Body("base", pos=(1 / 3, 0, 0)))
+    model.lights.extend(DEFAULT_LIGHTS)
+    first = ET.tostring(emit_model(model, precision=3))
+    assert ET.tostring(emit_model(model, precision=3)) == first
+    assert b'pos="0.333 0 0"' in ET.tostring(emit_model(model, precision=3))
+    assert b'pos="0.33333 0 0"' in ET.tostring(emit_model(model, precision=5))
+
+
+def chain(links):
+    body = root = Body("link_0", pos=(0.2, 0, 0))
+    for i in range(1, links):
+        child = Body("link_{}".format(i), pos=(0.2, 0, 0))
+        child.geoms.append(Geom("box", size=(0.1, 0.1, 0.1)))
+        body.bodies.append(child)
+        body = child
+    return root
+
+
+def test_emit_body_deep_chain():
+    links = 5000
+    parent = ET.Element("worldbody")
+    elements = {}
+    emit_body(parent, chain(links), elements=elements)
+
+    assert len(elements) == links
+    element = parent.find("body")
+    for i in range(links):
+        assert element.get("name") == "link_{}".format(i)
+        element = element.find("body")
+    assert element is None
+
+
+def test_emit_body_keeps_child_order():
+    body = Body("base")
+    body.bodies = [Body(name) for name in ("a", "b", "c")]
+    body.bodies[0].bodies.append(Body("a_child"))
+    parent = ET.Element("worldbody")
+    base = emit_body(parent, body)
+    assert [child.get("name") for child in base] == ["a", "b", "c"]
+    assert [child.get("name") for child in base.iter("body")] == [
+        "base",
+        "a",
+        "a_child",
+        "b",
+        "c",
+    ]
+
+
+def test_write_model_1000_link_chain(tmp_path):
+    # the benchmark's documented --links 1000 --topology chain case
+    model = Model("chain", "chain", chain(1000))
+    path = tmp_path / "chain.xml"
+    write_model(model, path)
+
+    root = ET.parse(str(path), ET.XMLParser(huge_tree=True)).getroot()
+    bodies = list(root.find("worldbody").iter("body"))
+    # the childclass body holding the chain, then every link
+    assert len(bodies) == 1001
+    assert bodies[-1].get("name") == "link_999"
+    assert bodies[-1].getparent().get("name") == "link_998"
@@ -0,0 +1,298 @@
+import numpy as np
+from lxml import etree
+
+from blender_to_mujoco.mjcf_reader import (
+    MESH_ASSETS,
+    BodyIndex,
+    DefaultClasses,
+    compiler_settings,
+    expand_includes,
+    floats,
+    orientation,
+    resolve_frame,
+    resolve_fromto,
+)
+
+DEGREES = {"angle": "degree", "eulerseq": "xyz"}
+RADIANS = {"angle": "radian", "eulerseq": "xyz"}
+
+
+def document(text):
+    return etree.fromstring(text)
+
+
+def write_files(folder, files):
+    for name, text in files.items():
+        (folder / name).parent.mkdir(exist_ok=True)
+        (folder / name).write_text(text)
+
+
+def parse(path):
+    return etree.parse(str(path)) if path.exists() else None
+
+
+def test_expand_includes_in_place(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "model.xml": """
+            <mujoco>
+              <worldbody>
+                <body name="base"/>
+                <include file="parts/arm.xml"/>
+                <body name="tail"/>
+              </worldbody>
+            </mujoco>""",
+            "parts/arm.xml": """
+            <mujoco>
+              <body name="arm"><include file="hand.xml"/></body>
+              <body name="leg"/>
+            </mujoco>""",
+            # include paths are relative to the main model folder
+            "hand.xml": '<mujoco><geom name="palm"/><site name="tip"/></mujoco>',
+        },
+    )
+    files = []
+    trees = {}
+
+    def cached_parse(path):
+        trees[path] = parse(path)
+        return trees[path]
+
+    root = expand_includes(tmp_path / "model.xml", tmp_path, cached_parse, files)
+    assert [body.get("name") for body in root.iter("body")] == [
+        "base",
+        "arm",
+        "leg",
+        "tail",
+    ]
+    arm = root.find("worldbody/body[@name='arm']")
+    assert [child.tag for child in arm] == ["geom", "site"]
+    assert not root.xpath("//include")
+    assert files == [
+        (tmp_path / name).resolve()
+        for name in ("model.xml", "parts/arm.xml", "hand.xml")
+    ]
+    # parsed trees are left as they were, so they can be cached
+    assert len(trees[files[0]].xpath("//include")) == 1
+    assert trees[files[2]].getroot().find("geom") is not None
+
+
+def test_expand_includes_drops_cycles_repeats_and_missing_files(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "model.xml": """
+            <mujoco>
+              <include file="a.xml"/>
+              <include file="a.xml"/>
+              <include file="missing.xml"/>
+            </mujoco>""",
+            "a.xml": '<mujoco><body name="a"/><include file="model.xml"/></mujoco>',
+        },
+    )
+    files = []
+    root = expand_includes(tmp_path / "model.xml", tmp_path, parse, files)
+    assert [child.get("name") for child in root] == ["a"]
+    assert files[-1] == (tmp_path / "missing.xml").resolve()
+    assert expand_includes(tmp_path / "missing.xml", tmp_path, parse) is None
+
+
+def same_rotation(a, b):
+    # q and -q are the same rotation
+    return np.allclose(a, b, atol=1e-9) or np.allclose(a, -np.asarray(b), atol=1e-9)
+
+
+def test_default_classes_inherit_and_childclass():
+    root = document("""
+        <mujoco>
+          <default>
+            <geom type="capsule" size="0.1"/>
+            <default class="arm">
+              <geom rgba="1 0 0 1"/>
+              <default class="tip"><geom size="0.05"/></default>
+            </default>
+          </default>
+          <worldbody>
+            <geom name="floor" type="plane"/>
+            <body childclass="arm">
+              <geom name="upper"/>
+              <geom name="lower" class="tip"/>
+              <body childclass="tip"><geom name="finger" type="box"/></body>
+            </body>
+          </worldbody>
+        </mujoco>
+        """)
+    defaults = DefaultClasses(root)
+    geoms = {geom.get("name"): defaults.resolve(geom) for geom in root.iter("geom")}
+    assert geoms["floor"] == {"name": "floor", "type": "plane", "size": "0.1"}
+    assert geoms["upper"] == {
+        "name": "upper",
+        "type": "capsule",
+        "size": "0.1",
+        "rgba": "1 0 0 1",
+    }
+    assert geoms["lower"]["size"] == "0.05"
+    assert geoms["lower"]["rgba"] == "1 0 0 1"
+    assert geoms["finger"]["type"] == "box"
+    assert geoms["finger"]["size"] == "0.05"
+
+
+def test_compiler_settings_defaults_and_overrides():
+    assert compiler_settings(document("<mujoco/>")) == DEGREES
+    root = document('<mujoco><compiler angle="radian" eulerseq="XYZ"/></mujoco>')
+    assert compiler_settings(root) == {"angle": "radian", "eulerseq": "XYZ"}
+
+
+def test_every_orientation_of_a_quarter_turn_around_z():
+    quarter = [np.cos(np.pi / 4), 0, 0, np.sin(np.pi / 4)]
+    for attrib in (
+        {"axisangle": "0 0 2 90"},
+        {"euler": "0 0 90"},
+        {"xyaxes": "0 1 0 -1 0 0"},
+    ):
+        assert same_rotation(orientation(attrib, DEGREES), quarter), attrib
+    assert same_rotation(
+        orientation({"axisangle": "0 0 1 1.5707963267948966"}, RADIANS), quarter
+    )
+    assert orientation({"pos": "1 2 3"}, DEGREES) is None
+
+
+def test_euler_sequences_intrinsic_and_extrinsic():
+    angles = {"euler": "30 45 60"}
+    x, y, z = (
+        orientation({"axisangle": axis + " " + angle}, DEGREES)
+        for axis, angle in (("1 0 0", "30"), ("0 1 0", "45"), ("0 0 1", "60"))
+    )
+
+    def product(*quats):
+        rotation = np.eye(3)
+        for quat in quats:
+            w, i, j, k = quat
+            rotation = rotation @ np.array(
+                [
+                    [1 - 2 * (j * j + k * k), 2 * (i * j - k * w), 2 * (i * k + j * w)],
+                    [2 * (i * j + k * w), 1 - 2 * (i * i + k * k), 2 * (j * k - i * w)],
+                    [2 * (i * k - j * w), 2 * (j * k + i * w), 1 - 2 * (i * i + j * j)],
+                ]
+            )
+        return rotation
+
+    intrinsic = orientation(angles, DEGREES)
+    extrinsic = orientation(angles, {"angle": "degree", "eulerseq": "XYZ"})
+    # rotating frame: x first, then the new y, then the new z
+    assert np.allclose(product(intrinsic), product(x, y, z))
+    # fixed axes: x first, then the world y and z
+    assert np.allclose(product(extrinsic), product(z, y, x))
+
+
+def test_xyaxes_orthogonalizes_y():
+    quat = orientation({"xyaxes": "1 0 0 1 1 0"}, DEGREES)
+    assert same_rotation(quat, [1, 0, 0, 0])
+
+
+def test_zaxis():
+    half = np.sqrt(0.5)
+    assert same_rotation(orientation({"zaxis": "1 0 0"}, DEGREES), [half, 0, half, 0])
+    assert same_rotation(orientation({"zaxis": "0 0 -3"}, DEGREES), [0, 1, 0, 0])
+    assert same_rotation(orientation({"zaxis": "0 0 2"}, DEGREES), [1, 0, 0, 0])
+
+
+def test_resolve_fromto_capsule_and_box():
+    capsule = resolve_fromto(
+        {"type": "capsule", "fromto": "0 0 0 2 0 0", "size": "0.1"}
+    )
+    assert floats(capsule["size"]) == [0.1, 1.0]
+    assert floats(capsule["pos"]) == [1.0, 0.0, 0.0]
+    half = np.sqrt(0.5)
+    assert same_rotation(floats(capsule["quat"]), [half, 0, half, 0])
+
+    box = resolve_fromto({"type": "box", "fromto": "0 0 1 0 0 3", "size": "0.2"})
+    assert floats(box["size"]) == [0.2, 0.0, 1.0]
+    assert floats(box["pos"]) == [0.0, 0.0, 2.0]
+    assert same_rotation(floats(box["quat"]), [1, 0, 0, 0])
+
+
+def test_resolve_frame_keeps_quat_and_drops_other_orientations():
+    attrib = resolve_frame({"quat": "0 1 0 0", "euler": "0 0 90"}, DEGREES)
+    assert attrib == {"quat": "0 1 0 0"}
+    attrib = resolve_frame({"axisangle": "1 0 0 180"}, DEGREES)
+    assert set(attrib) == {"quat"}
+    assert same_rotation(floats(attrib["quat"]), [0, 1, 0, 0])
+    assert resolve_frame({"pos": "1 2 3"}, DEGREES) == {"pos": "1 2 3"}
+
+
+def test_includes_nested_under_worldbody_body_asset_and_default(tmp_path):
+    write_files(
+        tmp_path,
+        {
+            "model.xml": """
+            <mujoco>
+              <default>
+                <default class="robot"><include file="robot_defaults.xml"/></default>
+              </default>
+              <asset><include file="meshes.xml"/></asset>
+              <worldbody>
+                <body name="base" childclass="robot">
+                  <include file="gripper.xml"/>
+                </body>
+                <include file="arm.xml"/>
+              </worldbody>
+            </mujoco>""",
+            "robot_defaults.xml": """
+            <mujoco>
+              <geom rgba="0 0 1 1"/>
+              <mesh scale="2 2 2"/>
+              <default class="finger"><geom type="capsule"/></default>
+            </mujoco>""",
+            "meshes.xml": """
+            <mujoco><mesh class="robot" name="link" file="link.stl"/></mujoco>""",
+            "gripper.xml": """
+            <mujoco>
+              <body name="finger"><geom class="finger" size="0.01 0.02"/></body>
+            </mujoco>""",
+            "arm.xml": """
+            <mujoco>
+              <body name="arm" euler="0 0 90">
+                <body name="forearm"><geom type="box" size="1 1 1"/></body>
+              </body>
+            </mujoco>""",
+        },
+    )
+    root = expand_includes(tmp_path / "model.xml", tmp_path, parse)
+    defaults = DefaultClasses(root)
+    index = BodyIndex()
+    index.build(root, defaults, compiler_settings(root))
+
+    assert [node.name for node in index.order] == ["base", "finger", "arm", "forearm"]
+    assert index.bodies["forearm"].parent is index.bodies["arm"]
+    assert index.bodies["arm"].parent is index.world
+    assert set(index.bodies["arm"].attrib) == {"name", "quat"}
+    # the included finger body keeps the childclass of the include site
+    finger = index.bodies["finger"]
+    assert finger.parent is index.bodies["base"]
+    assert finger.geoms == [{"type": "capsule", "size": "0.01 0.02", "rgba": "0 0 1 1"}]
+    # included default classes nest under the class around the include
+    meshes = [defaults.resolve(mesh) for mesh in MESH_ASSETS(root)]
+    assert meshes == [{"scale": "2 2 2", "name": "link", "file": "link.stl"}]
+
+
+def test_body_index_rows_round_trip():
+    root = document("""
+        <mujoco><worldbody>
+          <geom type="plane" size="1 1 1"/>
+          <body pos="0 0 1"><geom size="0.1"/><body name="tip"/></body>
+          <body pos="1 0 1"><geom size="0.1"/><body name="tip2"/></body>
+        </worldbody></mujoco>""")
+    index = BodyIndex()
+    index.build(root, DefaultClasses(root), compiler_settings(root))
+    # unnamed bodies are not in the name lookup
+    assert set(index.bodies) == {"world", "tip", "tip2"}
+    first, second = index.order[0], index.order[2]
+    assert first.key == second.key and first.placed_key != second.placed_key
+
+    copy = BodyIndex.from_rows(index.rows())
+    assert [node.name for node in copy.order] == [None, "tip", None, "tip2"]
+    assert copy.bodies["tip"].parent is copy.order[0]
+    assert copy.world.geoms == index.world.geoms
+    assert copy.order[0].key == first.key
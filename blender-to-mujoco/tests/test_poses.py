@@ -0,0 +1,55 @@
+import numpy as np
+
+from blender_to_mujoco.poses import euler_xyz, local_poses
+
+
+def axis_rotation(axis, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    rotation = np.eye(3)
+    rotation[i, i] = rotation[j, j] = c
+    rotation[i, j], rotation[j, i] = -s, s
+    return rotation
+
+
+def from_euler_xyz(angles):
+    """Rotation of MuJoCo's intrinsic xyz euler sequence."""
+    x, y, z = angles
+    return axis_rotation(0, x) @ axis_rotation(1, y) @ axis_rotation(2, z)
+
+
+def transform(rotation, position, scale=(1, 1, 1)):
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation * np.array(scale)
+    matrix[:3, 3] = position
+    return matrix
+
+
+def test_euler_xyz_round_trip():
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(-np.pi, np.pi, size=(50, 3))
+    angles[:, 1] /= 2.1
+    rotations = np.array([from_euler_xyz(a) for a in angles])
+    assert np.allclose(euler_xyz(rotations), angles)
+
+
+def test_euler_xyz_gimbal_lock_keeps_rotation():
+    rotation = from_euler_xyz((0.3, np.pi / 2, 0.2))
+    euler = euler_xyz(rotation[np.newaxis])[0]
+    assert euler[2] == 0.0
+    assert np.allclose(from_euler_xyz(euler), rotation)
+
+
+def test_local_poses_in_parent_space():
+    parent = transform(axis_rotation(2, 0.5), (1, 2, 3), scale=(2, 2, 2))
+    rotation = from_euler_xyz((0.1, -0.2, 0.3))
+    child = parent @ transform(rotation, (0.5, 0, 0), scale=(1, 3, 1))
+    world = np.array([parent, child])
+    parent_world = np.array([np.eye(4), parent])
+
+    positions, rotations, eulers = local_poses(world, parent_world)
+    assert np.allclose(positions, [(1, 2, 3), (0.5, 0, 0)])
+    # scale is removed from the rotations
+    assert np.allclose(rotations[0], axis_rotation(2, 0.5))
+    assert np.allclose(rotations[1], rotation)
+    assert np.allclose(eulers[1], (0.1, -0.2, 0.3))
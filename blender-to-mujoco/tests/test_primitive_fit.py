@@ -0,0 +1,90 @@
+import numpy as np
+
+from blender_to_mujoco.primitive_fit import best_primitive, fit_primitives
+
+
+def rotation_z(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([(c, -s, 0), (s, c, 0), (0, 0, 1)])
+
+
+def sphere_points(count=400):
+    # Fibonacci lattice, evenly spread over the unit sphere
+    i = np.arange(count) + 0.5
+    polar = np.arccos(1 - 2 * i / count)
+    azimuth = np.pi * (1 + 5**0.5) * i
+    return np.stack(
+        [
+            np.cos(azimuth) * np.sin(polar),
+            np.sin(azimuth) * np.sin(polar),
+            np.cos(polar),
+        ],
+        axis=1,
+    )
+
+
+def test_box_fit_follows_rotated_box():
+    half = np.array([1.0, 2.0, 3.0])
+    corners = np.array([(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)])
+    rotation = rotation_z(0.4)
+    points = corners * half @ rotation.T + (1.0, -2.0, 0.5)
+
+    fit = best_primitive(points, 8 * half.prod(), tolerance=0.01)
+    assert fit.primitive == "box"
+    assert np.allclose(sorted(fit.size), half)
+    assert np.allclose(fit.center, (1.0, -2.0, 0.5))
+    assert np.isclose(fit.volume, 48.0)
+    # every corner lies on the fitted box
+    local = (points - fit.center) @ fit.rotation
+    assert np.allclose(np.abs(local), fit.size)
+
+
+def test_sphere_fit_wins_near_tie_with_capsule():
+    points = sphere_points() * 0.5 + (0.0, 0.0, 2.0)
+    fit = best_primitive(points, 4 / 3 * np.pi * 0.5**3, tolerance=0.05)
+    assert fit.primitive == "sphere"
+    assert np.isclose(fit.size[0], 0.5, atol=1e-3)
+    assert np.allclose(fit.center, (0.0, 0.0, 2.0), atol=1e-3)
+
+
+def test_capsule_fit():
+    radius, length = 0.5, 1.0
+    ball = sphere_points() * radius
+    ball[:, 2] += np.sign(ball[:, 2]) * length
+    angle = np.linspace(0, 2 * np.pi, 32, endpoint=False)
+    side = np.stack(
+        [
+            np.repeat(radius * np.cos(angle), 5),
+            np.repeat(radius * np.sin(angle), 5),
+            np.tile(np.linspace(-length, length, 5), 32),
+        ],
+        axis=1,
+    )
+    points = np.vstack([ball, side])
+
+    reference = np.pi * radius**2 * 2 * length + 4 / 3 * np.pi * radius**3
+    fit = best_primitive(points, reference, tolerance=0.05)
+    assert fit.primitive == "capsule"
+    assert np.allclose(fit.size, (radius, length), atol=1e-2)
+    # capsules run along the local z axis
+    assert np.allclose(np.abs(fit.rotation[:, 2]), (0, 0, 1), atol=1e-6)
+
+
+def test_loose_fit_is_rejected():
+    points = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)], dtype=float)
+    assert best_primitive(points, 1 / 6, tolerance=0.5) is None
+    assert best_primitive(points, 0.0, tolerance=0.5) is None
+
+
+def test_every_fit_contains_the_points():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(200, 3)) * (1.0, 0.5, 0.2)
+    for fit in fit_primitives(points):
+        local = (points - fit.center) @ fit.rotation
+        if fit.primitive == "box":
+            assert (np.abs(local) <= np.array(fit.size) + 1e-9).all()
+        elif fit.primitive == "sphere":
+            assert (np.linalg.norm(local, axis=1) <= fit.size[0] + 1e-9).all()
+        else:
+            radial = np.linalg.norm(local[:, :2], axis=1)
+            assert (radial <= fit.size[0] + 1e-9).all()
@@ -1,6 +1,45 @@
 import bpy
+from mathutils import Matrix
 from lxml import etree
+from blender_to_mujoco.mesh_io import read_msh, read_obj, read_stl
+from blender_to_mujoco.mjcf_reader import (COMPILERS, MESH_ASSETS, TEXTURE_ASSETS, BodyIndex,
+                                            DefaultClasses, compiler_settings, expand_includes,
+                                            floats)
 from pathlib import Path
+import numpy as np
+import cProfile
+import hashlib
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# --- 0. PROFILING ---
+# Phase times and counters are written to import_report.json next to the
+# .blend file. Set PROFILE_IMPORT to also save a cProfile (import_profile.prof).
+PROFILE_IMPORT = False
+# Keep the parsed model in a cache folder next to the .blend file, so a
+# re-import of an unchanged model skips parsing and mesh decoding.
+USE_IMPORT_CACHE = True
+report = {"phases": {}, "counters": {}}
+
+@contextmanager
+def timed(phase):
+    """Adds the wall-clock time of the block to the phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = report["phases"]
+        phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+
+def count(name, amount=1):
+    report["counters"][name] = report["counters"].get(name, 0) + amount
+
+profile = cProfile.Profile() if PROFILE_IMPORT else None
+if profile:
+    profile.enable()
+import_start = time.perf_counter()
 
 # --- 1. SETUP PATHS DYNAMICALLY ---
 # Get the folder where the current .blend file is saved
@@ -32,125 +71,454 @@ class Mesh_info:
         self.meshes = meshes
         self.geoms = geoms
 
+# Parsed trees keyed by path, with the modification time they were parsed at.
+# Kept in the driver namespace so they survive re-running this script, and
+# files shared by several models are only parsed once per session.
+tree_cache = bpy.app.driver_namespace.setdefault("mujoco_tree_cache", {})
+
+# Procedural scenes can nest bodies deeper than libxml2 allows by default
+parser = etree.XMLParser(huge_tree=True)
+
 def parse_xml(file_path):
-    """Parses XML if file exists."""
+    """Parses XML if file exists, reusing the cached tree if it is unchanged."""
     if not file_path.exists():
         print(f"Error: File not found at {file_path}")
         return None
-    return etree.parse(str(file_path))
+    stat = file_path.stat()
+    key = str(file_path.resolve())
+    cached = tree_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns:
+        count("files_cached")
+        return cached[1]
+    with timed("parse"):
+        tree = etree.parse(str(file_path), parser)
+    tree_cache[key] = (stat.st_mtime_ns, tree)
+    count("files_parsed")
+    count("bytes_read", stat.st_size)
+    return tree
 
 # --- 2. START PARSING ---
-root_tree = parse_xml(main_xml_path)
-root = root_tree.getroot() if root_tree else None
-
-def find_path(root, loc, attribute_name):
-    """Finds attributes in the XML tree."""
-    if root is None: return []
-    
-    path_list = []
-    # Use generic xpath to find tags
-    for pos in root.xpath(f".//{loc}[@{attribute_name}]"):
-        path_list.append(pos.attrib[attribute_name])
-    return path_list
-
-def path_join_list(base_folder, relative_paths):
-    """Joins the base folder with the relative paths found in XML."""
-    full_paths = []
-    for p in relative_paths:
-        # Correctly joins paths regardless of OS
-        full_paths.append(base_folder / p)
-    return full_paths
-
-# Find includes (dependencies)
-# logic: looks for <include file="..."> inside the XML
-include_files = find_path(root, 'include', 'file')
-full_include_paths = path_join_list(base_path, include_files)
-
-def get_geom(root, tag_name):
-    '''get geom data and return a dict.'''
-    if root is None: return {}
-
-    b_count = 0
-    geom_dict = {}
-
-    # Process the main file first, then the included files
-    # Create a list of all trees to process
-    trees_to_process = [root]
-    
-    # Add included files to the processing list
-    for f in full_include_paths:
-        tree = parse_xml(f)
-        if tree:
-            trees_to_process.append(tree.getroot())
-
-    for current_root in trees_to_process:
-        for b in current_root.xpath("//body"):
-            g_count = 0
-            geom_list = []
-            body_count = 'body' + str(b_count)
-            
-            # Store body attributes
-            geom_list.append(b.attrib)
-            geom_dict.update({body_count: b.attrib})
-            b_count += 1
-
-            for g in b:
-                if g.tag == tag_name: # usually 'geom'
-                    geom_count = body_count + 'geom' + str(g_count)
-                    geom_list.append({geom_count: g.attrib})
-                    geom_dict[body_count] = geom_list
-                    g_count += 1
-
-    return geom_dict
-
-def parent_obj(obj_child, obj_parent):
-    '''parent object'''
-    bpy.ops.object.select_all(action='DESELECT')
-    
-    # The parent is the active object
-    obj_parent.select_set(True)
-    bpy.context.view_layer.objects.active = obj_parent
-    
-    # The child is selected but not active
-    obj_child.select_set(True)
-    
-    bpy.ops.object.parent_set(type='OBJECT')
-
-def prim_specs(geom_name, body_name, geom_size):
-    '''Resize and parent object based on XML data'''
-    if not bpy.context.selected_objects:
+# Default classes, orientations and the body index are in blender_to_mujoco.mjcf_reader
+def index_bodies(root, defaults):
+    """Builds the body index of the model."""
+    with timed("collect_bodies"):
+        body_index = BodyIndex()
+        body_index.build(root, defaults, compiler_settings(root))
+    return body_index
+
+# --- 3. MESH ASSETS ---
+def asset_folder(root, attribute):
+    """Folder of mesh or texture files, from <compiler meshdir/texturedir>."""
+    for compiler in COMPILERS(root):
+        folder = compiler.get(attribute) or compiler.get('assetdir')
+        if folder:
+            return base_path / folder
+    return base_path
+
+MESH_READERS = {'.obj': read_obj, '.stl': read_stl, '.msh': read_msh}
+
+def build_mesh(name, vertices, triangles):
+    """Creates a Blender mesh from arrays without operators or bmesh."""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    # cached arrays are memory-mapped and passed on without a copy
+    mesh.vertices.foreach_set('co', np.ascontiguousarray(vertices, dtype=np.float32).ravel())
+    mesh.loops.add(triangles.size)
+    mesh.loops.foreach_set('vertex_index', np.ascontiguousarray(triangles, dtype=np.int32).ravel())
+    mesh.polygons.add(len(triangles))
+    mesh.polygons.foreach_set('loop_start', np.arange(0, triangles.size, 3, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        # loop_total is derived from loop_start since Blender 4.0
+        mesh.polygons.foreach_set('loop_total', np.full(len(triangles), 3, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+def read_meshes(root, defaults):
+    """Decodes every <asset><mesh file>.
+
+    Returns {mesh name: (vertices, triangles)} and every mesh file looked
+    up, including missing ones, so the import cache notices when they appear.
+    """
+    folder = asset_folder(root, 'meshdir')
+    meshes = {}
+    files = []
+    with timed("meshes"):
+        for asset in MESH_ASSETS(root):
+            attrib = defaults.resolve(asset)
+            file_path = folder / attrib['file']
+            name = attrib.get('name', file_path.stem)
+            files.append(file_path.resolve())
+            reader = MESH_READERS.get(file_path.suffix.lower())
+            if reader is None or not file_path.exists():
+                print(f"Error: Cannot read mesh {file_path}")
+                continue
+            vertices, triangles = reader(file_path)
+            if attrib.get('scale'):
+                vertices = vertices * np.array(attrib['scale'].split(), dtype=np.float32)
+            meshes[name] = (vertices, triangles)
+    return meshes, files
+
+def build_meshes(arrays):
+    """Builds a Blender mesh from each (vertices, triangles) entry."""
+    meshes = {}
+    with timed("build_meshes"):
+        for name, (vertices, triangles) in arrays.items():
+            meshes[name] = build_mesh(name, vertices, triangles)
+            count("meshes")
+            count("mesh_vertices", len(vertices))
+    return meshes
+
+def texture_files(root):
+    """Returns {texture name: image path} of every <texture file> that exists,
+    and every texture file looked up."""
+    folder = asset_folder(root, 'texturedir')
+    files = {}
+    paths = []
+    for texture in TEXTURE_ASSETS(root):
+        file_path = folder / texture.get('file')
+        paths.append(file_path.resolve())
+        if file_path.exists():
+            files[texture.get('name', file_path.stem)] = str(file_path)
+    return files, paths
+
+def load_textures(files):
+    """Loads the images of texture_files and returns {texture name: image}."""
+    return {name: bpy.data.images.load(path, check_existing=True)
+            for name, path in files.items()}
+
+# Parenting is queued while importing and applied in one batch by apply_parents.
+# Parent > Object would update the view layer for every geom.
+parent_queue = []
+
+def parent_obj(obj_child, obj_parent, keep_transform=True):
+    '''queue parenting of obj_child to obj_parent
+
+    With keep_transform the child keeps its place, like Parent > Object.
+    Otherwise its transform is taken as relative to the parent, as MuJoCo
+    geom and body poses are.
+    '''
+    parent_queue.append((obj_child, obj_parent, keep_transform))
+
+def world_matrix(obj, worlds):
+    """World matrix from local transforms, without a view layer update."""
+    chain = []
+    while obj is not None and obj not in worlds:
+        chain.append(obj)
+        obj = obj.parent
+    matrix = worlds[obj] if obj is not None else Matrix.Identity(4)
+    for link in reversed(chain):
+        if link.parent is not None:
+            matrix = matrix @ link.matrix_parent_inverse @ link.matrix_basis
+        else:
+            matrix = link.matrix_basis.copy()
+        worlds[link] = matrix
+    return matrix
+
+def apply_parents():
+    '''Parent every queued object, then update the view layer once.'''
+    if not parent_queue:
         return
+    with timed("parent"):
+        # parent inverses come from the transforms before any change
+        worlds = {}
+        inverses = [world_matrix(parent, worlds).inverted_safe() if keep else Matrix.Identity(4)
+                    for child, parent, keep in parent_queue]
+        for (child, parent, keep), inverse in zip(parent_queue, inverses):
+            child.parent = parent
+            child.matrix_parent_inverse = inverse
+        count("parented", len(parent_queue))
+        parent_queue.clear()
+        bpy.context.view_layer.update()
+
+# --- 4. GEOM OBJECTS ---
+# Geoms share mesh datablocks: mesh assets have one each, and primitives use
+# a unit mesh scaled by the object, except capsules, keyed by their size.
+# Repeated body subtrees are built once and placed as collection instances.
+shared_meshes = {}
+
+def lathe(profile, segments=24):
+    """Vertices and triangles of a surface of revolution around z.
+
+    profile is (radius, z) from top to bottom; the first and last points
+    are on the axis.
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    rings = profile[1:-1]
+    angle = 2 * np.pi * np.arange(segments) / segments
+    ring_vertices = np.stack([np.outer(rings[:, 0], np.cos(angle)),
+                              np.outer(rings[:, 0], np.sin(angle)),
+                              np.repeat(rings[:, 1:], segments, axis=1)], axis=-1)
+    vertices = np.vstack([[0, 0, profile[0, 1]], ring_vertices.reshape(-1, 3),
+                          [0, 0, profile[-1, 1]]])
+
+    j = np.arange(segments)
+    k = (j + 1) % segments
+    bottom = len(vertices) - 1
+    last = 1 + (len(rings) - 1) * segments
+    triangles = [np.stack([np.zeros(segments, dtype=int), 1 + j, 1 + k], axis=1),
+                 np.stack([np.full(segments, bottom), last + k, last + j], axis=1)]
+    for r in range(len(rings) - 1):
+        a = 1 + r * segments + j
+        b = 1 + r * segments + k
+        triangles.append(np.stack([a, a + segments, b + segments], axis=1))
+        triangles.append(np.stack([a, b + segments, b], axis=1))
+    return vertices, np.vstack(triangles)
+
+def sphere_profile(rings=13):
+    """Unit sphere profile; an odd ring count leaves no ring on the equator."""
+    theta = np.pi * np.arange(rings + 1) / rings
+    return np.stack([np.sin(theta), np.cos(theta)], axis=1)
+
+def primitive_data(geom_type, size):
+    """Vertices and triangles of a primitive mesh, unit sized except capsules."""
+    if geom_type == 'box':
+        corners = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)])
+        triangles = np.array([[0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+                              [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3]])
+        return corners, triangles
+    if geom_type == 'plane':
+        corners = np.array([[-1, -1, 0], [1, -1, 0], [1, 1, 0], [-1, 1, 0]])
+        return corners, np.array([[0, 1, 2], [0, 2, 3]])
+    if geom_type == 'cylinder':
+        return lathe([(0, 1), (1, 1), (1, -1), (0, -1)])
+    if geom_type == 'capsule':
+        profile = sphere_profile() * size[0]
+        profile[:, 1] += np.sign(profile[:, 1]) * size[1]
+        return lathe(profile)
+    return lathe(sphere_profile())
+
+def primitive_scale(geom_type, size):
+    """Object scale that sizes the primitive mesh of a geom."""
+    if geom_type in ('box', 'ellipsoid'):
+        return size[:3]
+    if geom_type == 'plane':
+        # a size of 0 means an infinite plane in MuJoCo
+        return [size[0] or 1, size[1] or 1, 1]
+    if geom_type == 'cylinder':
+        return [size[0], size[0], size[1]]
+    if geom_type == 'capsule':
+        return [1, 1, 1]
+    return [size[0]] * 3
+
+def geom_mesh(attrib, mesh_spec):
+    """Shared mesh datablock of a geom and its object scale, or (None, None)."""
+    if attrib.get('mesh'):
+        return mesh_spec.meshes.get(attrib['mesh']), (1, 1, 1)
+    if not attrib.get('size'):
+        return None, None
 
-    obj = bpy.context.selected_objects[0]
-    obj.name = geom_name
-
-    # Handle resizing based on how many dimensions are provided
-    # Convert string "0.5 0.2" -> list [0.5, 0.2]
-    if isinstance(geom_size, str):
-        size_values = [float(x) for x in geom_size.split()]
-    else:
-        size_values = geom_size
-
-    if len(size_values) == 3:
-        obj.scale = (size_values[0], size_values[1], size_values[2])
-    elif len(size_values) == 2:
-        # Capsule/Cylinder logic often uses radius/height
-        obj.scale = (size_values[0], size_values[0], size_values[1])
-    elif len(size_values) == 1:
-        # Sphere logic
-        obj.scale = (size_values[0], size_values[0], size_values[0])
-
-    # Try to find the objects in Blender data to parent them
-    # Note: This requires the objects to already exist in Blender with these names
-    if body_name in bpy.data.objects and geom_name in bpy.data.objects:
-        g_parent = bpy.data.objects[body_name]
-        g_child = bpy.data.objects[geom_name]
-        parent_obj(g_child, g_parent)
+    geom_type = attrib.get('type', 'sphere')
+    # missing half-lengths and sizes count as 0 rather than failing the import
+    size = floats(attrib['size']) + [0, 0]
+    if geom_type not in ('box', 'plane', 'cylinder', 'capsule', 'ellipsoid', 'sphere'):
+        return None, None
+    key = (geom_type, tuple(size[:2])) if geom_type == 'capsule' else geom_type
+    if key not in shared_meshes:
+        shared_meshes[key] = build_mesh(f"mujoco_{geom_type}", *primitive_data(geom_type, size))
+    return shared_meshes[key], primitive_scale(geom_type, size)
+
+def place(obj, attrib):
+    """Sets the location and rotation of obj from MuJoCo pos and quat.
+
+    Other orientations were turned into quat when the body tree was indexed.
+    """
+    if attrib.get('pos'):
+        obj.location = [float(x) for x in attrib['pos'].split()]
+    if attrib.get('quat'):
+        # MuJoCo and Blender both store quaternions as w x y z
+        obj.rotation_mode = 'QUATERNION'
+        obj.rotation_quaternion = [float(x) for x in attrib['quat'].split()]
+
+def add_geom(attrib, mesh_spec, collection, parent=None):
+    """Creates the object of a geom, linking its shared mesh."""
+    mesh, scale = geom_mesh(attrib, mesh_spec)
+    if mesh is None:
+        return None
+    obj = bpy.data.objects.new(attrib.get('name', mesh.name), mesh)
+    collection.objects.link(obj)
+    place(obj, attrib)
+    obj.scale = scale
+    if parent is not None:
+        parent_obj(obj, parent, keep_transform=False)
+    count("geom_objects")
+    return obj
+
+def build_prototype(node, mesh_spec):
+    """Collection holding one copy of a body subtree, in the body's frame."""
+    collection = bpy.data.collections.new(f"{node.label}_prototype")
+    stack = [(node, None)]
+    while stack:
+        node, owner = stack.pop()
+        for geom in node.geoms:
+            add_geom(geom, mesh_spec, collection, owner)
+        for child in node.children:
+            empty = bpy.data.objects.new(child.label, None)
+            collection.objects.link(empty)
+            place(empty, child.attrib)
+            if owner is not None:
+                parent_obj(empty, owner, keep_transform=False)
+            stack.append((child, empty))
+    count("prototypes")
+    return collection
+
+def add_geom_objects(body_index, mesh_spec):
+    """Creates an empty for every body and an object for every geom.
+
+    Each is parented to the empty of its body, relative to it as in MuJoCo.
+    Body subtrees that repeat are built once and their empties instance it.
+    """
+    collection = bpy.context.scene.collection
+    repeats = Counter(node.key for node in body_index.order)
+    prototypes = {}
+    # empty of every body; the world is the scene itself
+    empties = {body_index.world: None}
+    instanced = set()
+
+    for geom in body_index.world.geoms:
+        add_geom(geom, mesh_spec, collection)
+
+    for node in body_index.order:
+        if node.parent in instanced:
+            instanced.add(node)
+            continue
+        parent = empties[node.parent]
+        empty = bpy.data.objects.new(node.label, None)
+        collection.objects.link(empty)
+        place(empty, node.attrib)
+        if parent is not None:
+            parent_obj(empty, parent, keep_transform=False)
+        empties[node] = empty
+        count("body_objects")
+
+        if repeats[node.key] > 1 and (node.geoms or node.children):
+            if node.key not in prototypes:
+                prototypes[node.key] = build_prototype(node, mesh_spec)
+            empty.instance_type = 'COLLECTION'
+            empty.instance_collection = prototypes[node.key]
+            instanced.add(node)
+            count("instances")
+            continue
+
+        for geom in node.geoms:
+            add_geom(geom, mesh_spec, collection, empty)
+
+# --- 5. MODEL CACHE ---
+# The body index, mesh arrays and texture paths of the last import, keyed by
+# the size and modification time of every XML, mesh and texture file they came
+# from or looked for, so a file that was missing invalidates the cache when it
+# appears.
+# Mesh arrays are stored in two .npy files and memory-mapped when loaded.
+CACHE_VERSION = 6
+cache_folder = base_path / f".{file_name}_import_cache"
+
+class ImportedModel:
+    """Everything the import reads from disk, without the XML trees"""
+
+    def __init__(self, files, body_index, meshes, textures):
+        self.files = files
+        self.body_index = body_index
+        self.meshes = meshes
+        self.textures = textures
+
+def read_model():
+    """Parses the model with its includes expanded and decodes its mesh files."""
+    xml_files = []
+    root = expand_includes(main_xml_path, base_path, parse_xml, xml_files)
+    if root is None:
+        return None
+    with timed("defaults"):
+        defaults = DefaultClasses(root)
+    body_index = index_bodies(root, defaults)
+    meshes, mesh_files = read_meshes(root, defaults)
+    textures, texture_paths = texture_files(root)
+    return ImportedModel([str(p) for p in xml_files + mesh_files + texture_paths],
+                         body_index, meshes, textures)
+
+def files_key(files):
+    """Hash of the size and modification time of files."""
+    digest = hashlib.sha1(str(CACHE_VERSION).encode())
+    for path in files:
+        try:
+            stat = Path(path).stat()
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{path}:missing\n".encode())
+    return digest.hexdigest()
+
+def save_model_cache(model):
+    names = list(model.meshes)
+    arrays = [model.meshes[name] for name in names]
+    vertex_ends = np.cumsum([len(v) for v, t in arrays]).tolist()
+    triangle_ends = np.cumsum([len(t) for v, t in arrays]).tolist()
+    manifest = {
+        "version": CACHE_VERSION,
+        "key": files_key(model.files),
+        "files": model.files,
+        "bodies": model.body_index.rows(),
+        "meshes": {name: [vertex_ends[i] - len(arrays[i][0]), vertex_ends[i],
+                          triangle_ends[i] - len(arrays[i][1]), triangle_ends[i]]
+                   for i, name in enumerate(names)},
+        "textures": model.textures,
+    }
+    with timed("cache_save"):
+        cache_folder.mkdir(exist_ok=True)
+        np.save(cache_folder / "vertices.npy",
+                np.concatenate([v for v, t in arrays]).astype(np.float32) if arrays
+                else np.zeros((0, 3), dtype=np.float32))
+        np.save(cache_folder / "triangles.npy",
+                np.concatenate([t for v, t in arrays]).astype(np.int32) if arrays
+                else np.zeros((0, 3), dtype=np.int32))
+        # the manifest goes last, so an interrupted save is never loaded
+        with open(cache_folder / "model.json", "w") as f:
+            json.dump(manifest, f)
+
+def load_model_cache():
+    """Returns the cached ImportedModel if no file it came from changed."""
+    try:
+        with open(cache_folder / "model.json") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != CACHE_VERSION or manifest["key"] != files_key(manifest["files"]):
+        return None
+
+    with timed("cache_load"):
+        vertices = np.load(cache_folder / "vertices.npy", mmap_mode='r')
+        triangles = np.load(cache_folder / "triangles.npy", mmap_mode='r')
+        meshes = {name: (vertices[a:b], triangles[c:d])
+                  for name, (a, b, c, d) in manifest["meshes"].items()}
+        body_index = BodyIndex.from_rows(manifest["bodies"])
+    count("cache_hits")
+    return ImportedModel(manifest["files"], body_index, meshes, manifest["textures"])
 
 # --- EXECUTE ---
-if root is not None:
-    geoms = get_geom(root, 'geom')
-    print(f"Found {len(geoms)} bodies with geometry.")
-    # Note: 'textures' and 'meshes' variables were not defined in your snippet
-    # so I commented this out to prevent a crash:
-    # mesh_spec = Mesh_info(textures, meshes, geoms)
+model = load_model_cache() if USE_IMPORT_CACHE and str(base_path) != '.' else None
+if model is None:
+    model = read_model()
+    if model is not None and USE_IMPORT_CACHE and str(base_path) != '.':
+        save_model_cache(model)
+
+if model is not None:
+    body_index = model.body_index
+    count("bodies", len(body_index.order))
+    nodes = [body_index.world] + body_index.order
+    geoms = [geom for node in nodes for geom in node.geoms]
+    count("geoms", len(geoms))
+    print(f"Found {len(geoms)} geoms.")
+    meshes = build_meshes(model.meshes)
+    textures = load_textures(model.textures)
+    mesh_spec = Mesh_info(textures, meshes, geoms)
+    print(f"Built {len(meshes)} meshes, loaded {len(textures)} textures.")
+    add_geom_objects(body_index, mesh_spec)
+    apply_parents()
+
+# --- REPORT ---
+report["seconds"] = time.perf_counter() - import_start
+if profile:
+    profile.disable()
+    profile.dump_stats(str(base_path / "import_profile.prof"))
+    report["profile"] = str(base_path / "import_profile.prof")
+if str(base_path) != '.':
+    with open(base_path / "import_report.json", "w") as f:
+        json.dump(report, f, indent=1)
+print(f"Import report: {report}")
@@ -23,53 +23,117 @@ from bpy.props import *
 from lxml import etree as ET
 from pathlib import Path
 import mathutils
+import numpy as np
 
 scene = bpy.context.scene
 collision_name = ""
 
-class ExportObj:
-    meshes = []
+class MeshData:
+    """Triangulated mesh buffers read from an evaluated mesh"""
 
-    def export_obj(
-        self,
-        file_path,
-        obj,
-        materials=True,
-        path_mode="AUTO",
-        groups=True,
-        sep_obj=False,
-    ):
-        if obj.properties.primitive == "mesh":
-            bpy.ops.export_scene.obj(
-                filepath="{}{}.obj".format(file_path, obj.name),
-                use_blen_objects=sep_obj,
-                group_by_object=groups,
-                use_selection=True,
-                use_triangles=True,
-                use_normals=True,
-                use_uvs=True,
-                use_materials=materials,
-                path_mode=path_mode,
-                axis_forward="Y",
-                axis_up="Z",
-            )
+    def __init__(self, name, vertices, triangles, loops, normals, uvs):
+        self.name = name
+        self.vertices = vertices
+        self.triangles = triangles
+        self.loops = loops
+        self.normals = normals
+        self.uvs = uvs
 
-    def export(self):
-        bpy.ops.object.select_all(action="DESELECT")
 
-        for mesh in self.meshes:
-            # duplicate mesh
-            new_object = BlenderObject.copy_object(self, mesh)
+def read_mesh_data(obj, depsgraph):
+    """Read vertex, loop and triangle data from the evaluated object.
+
+    Object scale is baked into the vertices, matching the old
+    parent_clear/transform_apply copy without touching the scene.
+    """
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+
+    try:
+        mesh.calc_loop_triangles()
+        if not hasattr(mesh, "corner_normals"):
+            mesh.calc_normals_split()
+
+        vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vertices)
+
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        loops = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", loops)
+
+        normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        if hasattr(mesh, "corner_normals"):
+            mesh.corner_normals.foreach_get("vector", normals)
+        else:
+            mesh.loops.foreach_get("normal", normals)
+
+        uvs = None
+        if mesh.uv_layers.active:
+            uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+            mesh.uv_layers.active.data.foreach_get("uv", uvs)
+            uvs = uvs.reshape(-1, 2)
+    finally:
+        eval_obj.to_mesh_clear()
+
+    scale = np.array(obj.scale, dtype=np.float32)
+    vertices = vertices.reshape(-1, 3) * scale
+
+    # normals transform with the inverse scale
+    normals = normals.reshape(-1, 3) / np.where(scale == 0, 1, scale)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals /= np.where(length == 0, 1, length)
+
+    return MeshData(
+        obj.name,
+        vertices,
+        triangles.reshape(-1, 3),
+        loops.reshape(-1, 3),
+        normals,
+        uvs,
+    )
+
+
+def format_rows(fmt, array):
+    """Format every row of a 2D array with one string operation."""
+    if len(array) == 0:
+        return ""
+    return (fmt * len(array)) % tuple(array.ravel().tolist())
+
+
+def write_obj(file_path, data):
+    """Write triangulated mesh data to an OBJ file."""
+    faces = data.triangles + 1
+    loops = data.loops + 1
 
-            print(new_object)
+    with open(file_path, "w") as f:
+        f.write("# URDF Exporter\no {}\n".format(data.name))
+        f.write(format_rows("v %.6f %.6f %.6f\n", data.vertices))
 
-            # select object mesh
-            new_object.select_set(True)
+        if data.uvs is not None:
+            f.write(format_rows("vt %.6f %.6f\n", data.uvs))
+            f.write(format_rows("vn %.4f %.4f %.4f\n", data.normals))
+            corners = np.stack((faces, loops, loops), axis=2)
+            f.write(format_rows("f %d/%d/%d %d/%d/%d %d/%d/%d\n", corners))
+        else:
+            f.write(format_rows("vn %.4f %.4f %.4f\n", data.normals))
+            corners = np.stack((faces, loops), axis=2)
+            f.write(format_rows("f %d//%d %d//%d %d//%d\n", corners))
+
+
+class ExportObj:
+    meshes = []
+
+    def export_obj(self, file_path, obj, depsgraph):
+        if obj.properties.primitive == "mesh" and obj.type == "MESH":
+            data = read_mesh_data(obj, depsgraph)
+            write_obj("{}{}.obj".format(file_path, obj.name), data)
 
-            exporter.export_obj(file.path, mesh, materials=False)
+    def export(self):
+        depsgraph = bpy.context.evaluated_depsgraph_get()
 
-            # delete copied object
-            bpy.ops.object.delete()
+        for mesh in self.meshes:
+            exporter.export_obj(file.path, mesh, depsgraph)
 
 
 class BlenderObject:
@@ -172,31 +236,6 @@ class BlenderObject:
             "material": None,
         }
 
-    def copy_object(self, object):
-        """Duplicate mesh object"""
-        object_name = bpy.data.objects[object.name]
-
-        # copy object
-        new_object = object_name.copy()
-        new_object.data = object_name.data.copy()
-
-        new_object.animation_data_clear()
-        bpy.context.collection.objects.link(new_object)
-
-        # select new object
-        bpy.data.objects[new_object.name].select_set(True)
-
-        # clear parent
-        bpy.ops.object.parent_clear(type="CLEAR")
-
-        # set transforms to 0
-        new_object.location = (0, 0, 0)
-        new_object.rotation_euler = (0, 0, 0)
-
-        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-
-        return bpy.data.objects[new_object.name]
-
     def vector_to_string(self, obj_vector):
         """Get XYZ data and convert it to "x y z" format."""
         vectors = ""
@@ -246,6 +285,7 @@ class XML:
 
     def write_main_xml(self):
         mytool = scene.my_tool
+        ExportObj.meshes.clear()
         for obj in bpy.data.objects:
             if obj.properties.primitive == "mesh" and mytool.export_files == True:
                 ExportObj.meshes.append(obj)